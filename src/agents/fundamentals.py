@@ -1,8 +1,4 @@
-from langchain_core.messages import HumanMessage
-
-from agents.state import AgentState, show_agent_reasoning
-
-import json
+from agents.state import AgentSignal, AgentState, show_agent_reasoning
 
 ##### Fundamental Agent #####
 def fundamentals_agent(state: AgentState):
@@ -94,23 +90,10 @@ def fundamentals_agent(state: AgentState):
     total_signals = len(signals)
     confidence = max(bullish_signals, bearish_signals) / total_signals
     
-    message_content = {
-        "signal": overall_signal,
-        "confidence": f"{round(confidence * 100)}%",
-        "reasoning": reasoning
-    }
-    
-    # Create the fundamental analysis message
-    message = HumanMessage(
-        content=json.dumps(message_content),
-        name="fundamentals_agent",
-    )
+    signal = AgentSignal(overall_signal, confidence, {"reasoning": reasoning})
     
     # Print the reasoning if the flag is set
     if show_reasoning:
-        show_agent_reasoning(message_content, "Fundamental Analysis Agent")
+        show_agent_reasoning(signal.to_dict(), "Fundamental Analysis Agent")
     
-    return {
-        "messages": [message],
-        "data": data,
-    }
\ No newline at end of file
+    return {"signals": {"fundamentals_agent": signal}}
\ No newline at end of file
@@ -0,0 +1,330 @@
+import math
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+from agents.technicals import calculate_hurst_exponent
+
+NAN = float('nan')
+
+
+class EWM:
+    """
+    Exponentially weighted mean updated one observation at a time
+
+    Follows the same recurrence as pandas' .ewm(...).mean() (ignore_na=False),
+    so feeding a series bar by bar reproduces the vectorized result. Pass
+    span for EMAs or alpha=1/period for Wilder smoothing.
+    """
+
+    __slots__ = ('alpha', 'adjust', 'value', '_old_wt')
+
+    def __init__(self, span: Optional[float] = None, adjust: bool = True, alpha: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1.0)
+        self.adjust = adjust
+        self.value = NAN
+        self._old_wt = 1.0
+
+    def update(self, x: float) -> float:
+        is_observation = x == x
+        if self.value == self.value:
+            old_wt_factor = 1.0 - self.alpha
+            new_wt = 1.0 if self.adjust else self.alpha
+            self._old_wt *= old_wt_factor
+            if is_observation:
+                if self.value != x:
+                    self.value = (self._old_wt * self.value + new_wt * x) / (self._old_wt + new_wt)
+                self._old_wt = self._old_wt + new_wt if self.adjust else 1.0
+        elif is_observation:
+            self.value = x
+        return self.value
+
+
+class RollingWindow:
+    """
+    Rolling sum, mean and sample standard deviation over a fixed window
+
+    Values are added and evicted in O(1) with a compensated sum and
+    Welford-style variance updates. NaN observations occupy a slot but are
+    not counted; results are NaN until the window holds `window` observations,
+    matching pandas' default min_periods.
+    """
+
+    __slots__ = ('window', '_values', '_count', '_sum', '_sum_comp', '_mean', '_m2')
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._count = 0
+        self._sum = 0.0
+        self._sum_comp = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x: float) -> None:
+        self._values.append(x)
+        if x == x:
+            self._add(x)
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if old == old:
+                self._remove(old)
+
+    def _kahan(self, x: float) -> None:
+        y = x - self._sum_comp
+        t = self._sum + y
+        self._sum_comp = (t - self._sum) - y
+        self._sum = t
+
+    def _add(self, x: float) -> None:
+        self._count += 1
+        self._kahan(x)
+        delta = x - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (x - self._mean)
+
+    def _remove(self, x: float) -> None:
+        self._count -= 1
+        self._kahan(-x)
+        if self._count == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = x - self._mean
+        self._mean -= delta / self._count
+        self._m2 -= delta * (x - self._mean)
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.window
+
+    @property
+    def sum(self) -> float:
+        return self._sum if self.ready else NAN
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._count if self.ready else NAN
+
+    @property
+    def std(self) -> float:
+        if not self.ready or self._count < 2:
+            return NAN
+        return math.sqrt(max(self._m2, 0.0) / (self._count - 1))
+
+
+class RollingMoments:
+    """
+    Rolling bias-corrected skewness and excess kurtosis over a fixed window
+
+    Keeps running power sums so each update is O(1); the estimators are the
+    ones pandas uses for .rolling(window).skew() and .kurt().
+    """
+
+    __slots__ = ('window', '_values', '_count', '_s1', '_s2', '_s3', '_s4')
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._count = 0
+        self._s1 = self._s2 = self._s3 = self._s4 = 0.0
+
+    def update(self, x: float) -> None:
+        self._values.append(x)
+        if x == x:
+            self._accumulate(x, 1)
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if old == old:
+                self._accumulate(old, -1)
+
+    def _accumulate(self, x: float, sign: int) -> None:
+        self._count += sign
+        x2 = x * x
+        self._s1 += sign * x
+        self._s2 += sign * x2
+        self._s3 += sign * x2 * x
+        self._s4 += sign * x2 * x2
+
+    def _central(self):
+        n = float(self._count)
+        a = self._s1 / n
+        b = self._s2 / n - a * a
+        return n, a, b
+
+    @property
+    def skew(self) -> float:
+        if self._count < max(self.window, 3):
+            return NAN
+        n, a, b = self._central()
+        if b <= 1e-14:
+            return NAN
+        c = self._s3 / n - a * a * a - 3 * a * b
+        return (math.sqrt(n * (n - 1.0)) * c) / ((n - 2.0) * b ** 1.5)
+
+    @property
+    def kurt(self) -> float:
+        if self._count < max(self.window, 4):
+            return NAN
+        n, a, b = self._central()
+        if b <= 1e-14:
+            return NAN
+        c = self._s3 / n - a * a * a - 3 * a * b
+        d = self._s4 / n - a ** 4 - 6 * b * a * a - 4 * c * a
+        k = (n * n - 1.0) * d / (b * b) - 3 * ((n - 1.0) ** 2)
+        return k / ((n - 2.0) * (n - 3.0))
+
+
+class DirectionalMovement:
+    """
+    ADX and ATR updated one bar at a time
+
+    Streaming counterpart of calculate_directional_indicators: the true range
+    is computed once per bar and shared by the directional index and the ATR.
+    """
+
+    __slots__ = ('_prev', '_tr_ewm', '_plus_ewm', '_minus_ewm', '_adx_ewm', '_atr', 'adx')
+
+    def __init__(self, period: int = 14):
+        self._prev = None
+        self._tr_ewm = EWM(span=period)
+        self._plus_ewm = EWM(span=period)
+        self._minus_ewm = EWM(span=period)
+        self._adx_ewm = EWM(span=period)
+        self._atr = RollingWindow(period)
+        self.adx = NAN
+
+    def update(self, high: float, low: float, close: float) -> None:
+        if self._prev is None:
+            true_range = high - low
+            plus_dm = minus_dm = 0.0
+        else:
+            prev_high, prev_low, prev_close = self._prev
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            up_move = high - prev_high
+            down_move = prev_low - low
+            plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+            minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+        self._prev = (high, low, close)
+
+        tr_ewm = self._tr_ewm.update(true_range)
+        plus_ewm = self._plus_ewm.update(plus_dm)
+        minus_ewm = self._minus_ewm.update(minus_dm)
+        plus_di = 100 * plus_ewm / tr_ewm if tr_ewm else NAN
+        minus_di = 100 * minus_ewm / tr_ewm if tr_ewm else NAN
+        di_sum = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum else NAN
+        self.adx = self._adx_ewm.update(dx)
+        self._atr.update(true_range)
+
+    @property
+    def atr(self) -> float:
+        return self._atr.mean
+
+
+class TechnicalIndicatorStream:
+    """
+    Incremental state for every indicator the technical strategies read
+
+    Each update() consumes one daily bar in O(1) (the Hurst exponent is
+    evaluated over a bounded trailing window), and snapshot() returns the
+    latest values in the form calculate_signals_from_snapshot expects. A
+    backtest steps one stream forward across the whole history instead of
+    recomputing every indicator from scratch on each simulated day.
+    """
+
+    def __init__(self, hurst_window: int = 126, hurst_max_lag: int = 20):
+        self.hurst_max_lag = hurst_max_lag
+        self.bars = 0
+        self._close = NAN
+        self._volume = NAN
+        self._prev_close = None
+        self._ema = {span: EWM(span=span, adjust=False) for span in (8, 21, 55)}
+        self._directional = DirectionalMovement(14)
+        self._close_20 = RollingWindow(20)
+        self._close_50 = RollingWindow(50)
+        self._gains = {period: RollingWindow(period) for period in (14, 28)}
+        self._losses = {period: RollingWindow(period) for period in (14, 28)}
+        self._returns_sum = {window: RollingWindow(window) for window in (21, 63, 126)}
+        self._returns_21 = RollingWindow(21)
+        self._returns_moments = RollingMoments(63)
+        self._volume_21 = RollingWindow(21)
+        self._hist_vol_63 = RollingWindow(63)
+        self._hist_vol = NAN
+        self._closes = deque(maxlen=hurst_window)
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Consume the next bar; bars must arrive in date order."""
+        self.bars += 1
+        self._close = close
+        self._volume = volume
+        for ema in self._ema.values():
+            ema.update(close)
+        self._directional.update(high, low, close)
+        self._close_20.update(close)
+        self._close_50.update(close)
+        self._volume_21.update(volume)
+        self._closes.append(close)
+
+        if self._prev_close is None:
+            delta = NAN
+            daily_return = NAN
+        else:
+            delta = close - self._prev_close
+            daily_return = delta / self._prev_close if self._prev_close else NAN
+        self._prev_close = close
+
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        for period in self._gains:
+            self._gains[period].update(gain)
+            self._losses[period].update(loss)
+
+        for window in self._returns_sum.values():
+            window.update(daily_return)
+        self._returns_21.update(daily_return)
+        self._returns_moments.update(daily_return)
+        self._hist_vol = self._returns_21.std * math.sqrt(252)
+        self._hist_vol_63.update(self._hist_vol)
+
+    def _rsi(self, period: int) -> float:
+        avg_gain = np.float64(self._gains[period].mean)
+        avg_loss = np.float64(self._losses[period].mean)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def snapshot(self) -> Dict[str, float]:
+        """Latest indicator values, keyed as calculate_signals_from_snapshot expects."""
+        bb_mean = self._close_20.mean
+        bb_std = self._close_20.std
+        hurst = (
+            calculate_hurst_exponent(np.array(self._closes), self.hurst_max_lag)
+            if len(self._closes) > self.hurst_max_lag else NAN
+        )
+        values = {
+            'close': self._close,
+            'ema_8': self._ema[8].value,
+            'ema_21': self._ema[21].value,
+            'ema_55': self._ema[55].value,
+            'adx': self._directional.adx,
+            'atr': self._directional.atr,
+            'ma_50': self._close_50.mean,
+            'std_50': self._close_50.std,
+            'bb_upper': bb_mean + bb_std * 2,
+            'bb_lower': bb_mean - bb_std * 2,
+            'rsi_14': self._rsi(14),
+            'rsi_28': self._rsi(28),
+            'mom_1m': self._returns_sum[21].sum,
+            'mom_3m': self._returns_sum[63].sum,
+            'mom_6m': self._returns_sum[126].sum,
+            'volume': self._volume,
+            'volume_ma_21': self._volume_21.mean,
+            'hist_vol': self._hist_vol,
+            'vol_ma_63': self._hist_vol_63.mean,
+            'vol_std_63': self._hist_vol_63.std,
+            'skew_63': self._returns_moments.skew,
+            'kurt_63': self._returns_moments.kurt,
+            'hurst': hurst,
+        }
+        return {key: np.float64(value) for key, value in values.items()}
@@ -1,74 +1,52 @@
 
-from langchain_openai.chat_models import ChatOpenAI
+from agents.state import AgentState, time_budget
+from tools.api import resolve_date_range
+from tools.async_api import AsyncFinancialDatasetsClient
+from tools.price_bars import PriceBars
 
-from agents.state import AgentState
-from tools.api import search_line_items, get_financial_metrics, get_insider_trades, get_market_cap, get_prices
+import asyncio
+import os
 
-from datetime import datetime
-
-llm = ChatOpenAI(model="gpt-4o")
+# Seconds allowed for all of a ticker's market data requests to complete
+MARKET_DATA_TIMEOUT = float(os.environ.get("MARKET_DATA_TIMEOUT", 60))
 
 def market_data_agent(state: AgentState):
     """Responsible for gathering and preprocessing market data"""
-    messages = state["messages"]
     data = state["data"]
 
-    # Set default dates
-    end_date = data["end_date"] or datetime.now().strftime('%Y-%m-%d')
-    if not data["start_date"]:
-        # Calculate 3 months before end_date
-        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-        start_date = end_date_obj.replace(month=end_date_obj.month - 3) if end_date_obj.month > 3 else \
-            end_date_obj.replace(year=end_date_obj.year - 1, month=end_date_obj.month + 9)
-        start_date = start_date.strftime('%Y-%m-%d')
-    else:
-        start_date = data["start_date"]
-
-    # Get the historical price data
-    prices = get_prices(
-        ticker=data["ticker"], 
-        start_date=start_date, 
-        end_date=end_date,
-    )
-
-    # Get the financial metrics
-    financial_metrics = get_financial_metrics(
-        ticker=data["ticker"], 
-        report_period=end_date, 
-        period='ttm', 
-        limit=1,
-    )
-
-    # Get the insider trades
-    insider_trades = get_insider_trades(
-        ticker=data["ticker"], 
-        end_date=end_date,
-        limit=5,
-    )
-
-    # Get the market cap
-    market_cap = get_market_cap(
-        ticker=data["ticker"],
-    )
-
-    # Get the line_items
-    financial_line_items = search_line_items(
-        ticker=data["ticker"], 
-        line_items=["free_cash_flow", "net_income", "depreciation_and_amortization", "capital_expenditure", "working_capital"],
-        period='ttm',
-        limit=2,
-    )
-
+    start_date, end_date = resolve_date_range(data["start_date"], data["end_date"])
+
+    # Use the bundle prefetched for the whole universe if there is one,
+    # otherwise fetch prices, financial metrics, insider trades, market cap
+    # and line items concurrently within a single timeout budget
+    market_data = data.get("market_data")
+    if market_data is None:
+        client = AsyncFinancialDatasetsClient()
+        try:
+            market_data = asyncio.run(
+                client.get_market_data(
+                    ticker=data["ticker"],
+                    start_date=start_date,
+                    end_date=end_date,
+                    timeout=time_budget(state, MARKET_DATA_TIMEOUT),
+                )
+            )
+        finally:
+            # Requests still running after a timeout finish in the background
+            client.close()
+
+    # Parse the bars once into a shared read-only container; downstream
+    # agents wrap it in a DataFrame without copying
+    prices = market_data["prices"]
+    if not isinstance(prices, PriceBars):
+        prices = PriceBars.from_records(prices)
+
+    # Return only the new keys; the state reducer merges them into data
     return {
-        "messages": messages,
         "data": {
-            **data, 
-            "prices": prices, 
-            "start_date": start_date, 
+            **market_data,
+            "prices": prices,
+            "start_date": start_date,
             "end_date": end_date,
-            "financial_metrics": financial_metrics,
-            "insider_trades": insider_trades,
-            "market_cap": market_cap,
-            "financial_line_items": financial_line_items,
         }
     }
\ No newline at end of file
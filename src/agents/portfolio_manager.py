@@ -1,29 +1,60 @@
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai.chat_models import ChatOpenAI
+from pydantic import BaseModel, Field, ValidationError
 
-from agents.state import AgentState, show_agent_reasoning
+from agents.state import AgentState, render_signal, show_agent_reasoning, time_budget
+from tools.api import prices_to_df
+from tools.cache import get_response_cache
+from tools.llm import get_structured_llm
 
+from typing import List, Literal
+import json
+import logging
+import math
+import os
 
-##### Portfolio Management Agent #####
-def portfolio_management_agent(state: AgentState):
-    """Makes final trading decisions and generates orders"""
-    show_reasoning = state["metadata"]["show_reasoning"]
-    portfolio = state["data"]["portfolio"]
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_MANAGER_MODEL = "gpt-4o"
+
+# Seconds a cached portfolio decision is reused for identical prompt inputs;
+# 0 disables the decision cache
+DECISION_CACHE_TTL = float(os.environ.get("LLM_DECISION_CACHE_TTL", 24 * 60 * 60))
+
+# Signal weights from the portfolio manager's prompt, used by the rule-based mode
+SIGNAL_WEIGHTS = {
+    "valuation_agent": 0.35,
+    "fundamentals_agent": 0.30,
+    "technical_analyst_agent": 0.25,
+    "sentiment_agent": 0.10,
+}
+
+SIGNAL_DIRECTIONS = {"bullish": 1, "neutral": 0, "bearish": -1}
 
-    # Get the technical analyst, fundamentals agent, and risk management agent messages
-    technical_message = next(msg for msg in state["messages"] if msg.name == "technical_analyst_agent")
-    fundamentals_message = next(msg for msg in state["messages"] if msg.name == "fundamentals_agent")
-    sentiment_message = next(msg for msg in state["messages"] if msg.name == "sentiment_agent")
-    valuation_message = next(msg for msg in state["messages"] if msg.name == "valuation_agent")
-    risk_message = next(msg for msg in state["messages"] if msg.name == "risk_management_agent")
-
-    # Create the prompt template
-    template = ChatPromptTemplate.from_messages(
-        [
-            (
-                "system",
-                """You are a portfolio manager making final trading decisions.
+
+class DecisionAgentSignal(BaseModel):
+    agent: str
+    signal: Literal["bullish", "bearish", "neutral"]
+    # Passed through from the agents; valuation's can exceed 1
+    confidence: float
+
+class PortfolioDecision(BaseModel):
+    """The portfolio manager's trading decision for one ticker."""
+    action: Literal["buy", "sell", "hold"]
+    quantity: int = Field(ge=0)
+    confidence: float = Field(ge=0, le=1)
+    agent_signals: List[DecisionAgentSignal]
+    reasoning: str
+
+class TickerDecision(PortfolioDecision):
+    ticker: str
+
+class BatchPortfolioDecision(BaseModel):
+    decisions: List[TickerDecision]
+
+
+# Shared by the single-ticker and batched decision prompts
+SYSTEM_PROMPT = """You are a portfolio manager making final trading decisions.
                 Your job is to make a trading decision based on the team's analysis while strictly adhering
                 to risk management constraints.
 
@@ -69,10 +100,13 @@ def portfolio_management_agent(state: AgentState):
                 - Only sell if you have shares to sell
                 - Quantity must be ≤ current position for sells
                 - Quantity must be ≤ max_position_size from risk management"""
-            ),
-            (
-                "human",
-                """Based on the team's analysis below, make your trading decision.
+
+DECISION_TEMPLATE = ChatPromptTemplate.from_messages(
+    [
+        ("system", SYSTEM_PROMPT),
+        (
+            "human",
+            """Based on the team's analysis below, make your trading decision.
 
                 Technical Analysis Trading Signal: {technical_message}
                 Fundamental Analysis Trading Signal: {fundamentals_message}
@@ -91,34 +125,216 @@ def portfolio_management_agent(state: AgentState):
                 You can only buy if you have available cash.
                 You can only sell if you have shares in the portfolio to sell.
                 """
-            ),
-        ]
-    )
+        ),
+    ]
+)
+
+BATCH_DECISION_TEMPLATE = ChatPromptTemplate.from_messages(
+    [
+        ("system", SYSTEM_PROMPT),
+        (
+            "human",
+            """Based on the team's analysis below, make a trading decision for each ticker.
+
+                Each entry lists the analyst signals (signal and confidence between 0 and 1),
+                the risk management constraints and the current portfolio for one ticker:
+                {summaries}
+
+                Return a JSON object of the form {{"decisions": [...]}} with exactly one decision per ticker.
+                Each decision must contain the ticker, action, quantity, reasoning, confidence and agent_signals.  Do not include any JSON markdown.
+
+                Remember, the action must be either buy, sell, or hold.
+                You can only buy if you have available cash.
+                You can only sell if you have shares in the portfolio to sell.
+                """
+        ),
+    ]
+)
+
+
+##### Portfolio Management Agent #####
+def portfolio_management_agent(state: AgentState):
+    """Makes final trading decisions and generates orders"""
+    show_reasoning = state["metadata"]["show_reasoning"]
+    portfolio = state["data"]["portfolio"]
+
+    # Get the analyst and risk management signals
+    signals = state["signals"]
 
     # Generate the prompt
-    prompt = template.invoke(
+    prompt = build_decision_prompt(signals, portfolio)
+
+    # Invoke the LLM, unless the same inputs were already decided
+    decision = invoke_with_decision_cache(prompt, timeout=time_budget(state))
+
+    # Create the portfolio management message
+    message = HumanMessage(
+        content=decision.model_dump_json(),
+        name="portfolio_management",
+    )
+
+    # Print the decision if the flag is set
+    if show_reasoning:
+        show_agent_reasoning(decision.model_dump(), "Portfolio Management Agent")
+
+    return {"messages": [message]}
+
+def build_decision_prompt(signals, portfolio):
+    """Render the single-ticker decision prompt from the agents' signals."""
+    return DECISION_TEMPLATE.invoke(
         {
-            "technical_message": technical_message.content, 
-            "fundamentals_message": fundamentals_message.content,
-            "sentiment_message": sentiment_message.content,
-            "valuation_message": valuation_message.content,
-            "risk_message": risk_message.content,
+            "technical_message": render_signal(signals["technical_analyst_agent"]),
+            "fundamentals_message": render_signal(signals["fundamentals_agent"]),
+            "sentiment_message": render_signal(signals["sentiment_agent"]),
+            "valuation_message": render_signal(signals["valuation_agent"]),
+            "risk_message": render_signal(signals["risk_management_agent"]),
             "portfolio_cash": f"{portfolio['cash']:.2f}",
             "portfolio_stock": portfolio["stock"]
         }
     )
-    # Invoke the LLM
-    llm = ChatOpenAI(model="gpt-4o")
-    result = llm.invoke(prompt)
 
-    # Create the portfolio management message
+def invoke_with_decision_cache(prompt, schema=PortfolioDecision, timeout=None):
+    """Return the model's decision for prompt, reusing a cached one when possible.
+
+    The model replies through structured outputs, so the decision arrives as
+    a validated ``schema`` instance rather than text to be parsed. The key
+    is a hash of the model name and the rendered prompt, which covers every
+    input: the five upstream signals and the portfolio. Entries expire after
+    DECISION_CACHE_TTL seconds and share the response cache's size-bounded
+    LRU eviction; one that no longer matches the schema is treated as a miss.
+    ``timeout`` bounds the seconds spent on each request to the model.
+    """
+    cache = get_response_cache() if DECISION_CACHE_TTL > 0 else None
+    params = {"model": PORTFOLIO_MANAGER_MODEL, "prompt": prompt.to_string()}
+    if cache is not None:
+        cached = cache.get("llm-decisions", params)
+        if cached is not None:
+            try:
+                return schema.model_validate_json(cached)
+            except ValidationError:
+                pass
+
+    # Only pass a timeout when there is one; None would lift the client's default
+    options = {"timeout": timeout} if timeout is not None else {}
+    decision = get_structured_llm(PORTFOLIO_MANAGER_MODEL, schema).invoke(prompt, **options)
+
+    if cache is not None:
+        cache.set("llm-decisions", params, decision.model_dump_json(), ttl=DECISION_CACHE_TTL)
+    return decision
+
+
+def summarize_signals(signals, portfolio) -> dict:
+    """Compact view of one ticker's signals for the batched decision prompt."""
+    risk = signals["risk_management_agent"]
+    return {
+        "signals": {
+            agent: {"signal": signals[agent].signal, "confidence": round(signals[agent].confidence, 2)}
+            for agent in SIGNAL_WEIGHTS
+        },
+        "risk": {
+            "trading_action": risk.trading_action,
+            "max_position_size": round(risk.max_position_size, 2),
+            "risk_score": risk.risk_score,
+        },
+        "portfolio": {"cash": round(portfolio["cash"], 2), "stock": portfolio["stock"]},
+    }
+
+def batch_portfolio_decisions(entries, chunk_size: int = 10):
+    """Decide many tickers with one LLM call per chunk instead of one per ticker.
+
+    Args:
+        entries: Dictionary of ticker to (signals, portfolio), where signals is
+            the "signals" state of a graph run without the portfolio manager
+        chunk_size: Maximum number of tickers per LLM call
+
+    Returns:
+        Dictionary of ticker to PortfolioDecision. Tickers missing from a batch
+        reply, or in a chunk whose call failed, fall back to the single-ticker
+        prompt; a ticker whose single-ticker call fails too maps to None, so
+        one failure never loses the other tickers' decisions.
+    """
+    tickers = list(entries)
+    decisions = {}
+    for start in range(0, len(tickers), chunk_size):
+        chunk = tickers[start:start + chunk_size]
+        try:
+            summaries = {ticker: summarize_signals(*entries[ticker]) for ticker in chunk}
+            prompt = BATCH_DECISION_TEMPLATE.invoke({"summaries": json.dumps(summaries)})
+            reply = invoke_with_decision_cache(prompt, BatchPortfolioDecision)
+        except Exception as e:
+            logger.error(f"Batch decision failed for {', '.join(chunk)}, deciding them individually: {e}")
+        else:
+            for decision in reply.decisions:
+                if decision.ticker in summaries and decision.ticker not in decisions:
+                    decisions[decision.ticker] = PortfolioDecision.model_validate(
+                        decision.model_dump(exclude={"ticker"})
+                    )
+
+        for ticker in chunk:
+            if ticker not in decisions:
+                try:
+                    decisions[ticker] = invoke_with_decision_cache(build_decision_prompt(*entries[ticker]))
+                except Exception as e:
+                    logger.error(f"Decision failed for {ticker}: {e}")
+                    decisions[ticker] = None
+    return {ticker: decisions[ticker] for ticker in tickers}
+
+
+##### Rule-Based Portfolio Management Agent #####
+def rule_based_portfolio_management_agent(state: AgentState):
+    """Applies the portfolio manager's rules deterministically, without the LLM.
+
+    The risk manager's trading_action is a hard constraint: hold (or a
+    neutral valuation) holds, reduce sells half the position, bullish allows
+    buys and bearish allows sells. Within that, the weighted score of the
+    analyst signals (valuation 35%, fundamentals 30%, technical 25%,
+    sentiment 10%) must agree with the direction, and its magnitude scales
+    the trade: buys target that fraction of max_position_size and sells
+    that fraction of the position. Emits the same JSON as the LLM.
+    """
+    show_reasoning = state["metadata"]["show_reasoning"]
+    portfolio = state["data"]["portfolio"]
+    signals = state["signals"]
+    risk = signals["risk_management_agent"]
+    current_price = float(prices_to_df(state["data"]["prices"])["close"].iloc[-1])
+
+    score = sum(
+        weight * SIGNAL_DIRECTIONS[signals[agent].signal] * signals[agent].confidence
+        for agent, weight in SIGNAL_WEIGHTS.items()
+    )
+    confidence = min(abs(score), 1.0)
+
+    action, quantity = "hold", 0
+    if risk.trading_action == "reduce" and portfolio["stock"] > 0:
+        action, quantity = "sell", math.ceil(portfolio["stock"] / 2)
+    elif risk.trading_action == "bullish" and score > 0:
+        position_value = portfolio["stock"] * current_price
+        budget = min(risk.max_position_size * confidence - position_value, portfolio["cash"])
+        quantity = max(int(budget // current_price), 0)
+        action = "buy" if quantity > 0 else "hold"
+    elif risk.trading_action == "bearish" and score < 0 and portfolio["stock"] > 0:
+        action, quantity = "sell", max(int(portfolio["stock"] * confidence), 1)
+    if action == "hold":
+        quantity = 0
+
+    decision = PortfolioDecision(
+        action=action,
+        quantity=quantity,
+        confidence=round(confidence, 2),
+        agent_signals=[
+            DecisionAgentSignal(agent=agent, signal=signals[agent].signal, confidence=signals[agent].confidence)
+            for agent in SIGNAL_WEIGHTS
+        ],
+        reasoning=f"Risk action {risk.trading_action} (risk score {risk.risk_score}/10, "
+                  f"max position ${risk.max_position_size:,.2f}); weighted signal score {score:+.2f}",
+    )
+
     message = HumanMessage(
-        content=result.content,
+        content=decision.model_dump_json(),
         name="portfolio_management",
     )
 
-    # Print the decision if the flag is set
     if show_reasoning:
-        show_agent_reasoning(message.content, "Portfolio Management Agent")
+        show_agent_reasoning(decision.model_dump(), "Portfolio Management Agent")
 
-    return {"messages": state["messages"] + [message]}
\ No newline at end of file
+    return {"messages": [message]}
@@ -1,43 +1,33 @@
 import math
 
-from langchain_core.messages import HumanMessage
-
-from agents.state import AgentState, show_agent_reasoning
+from agents.state import AgentState, RiskAssessment, agent_parameters, show_agent_reasoning
 from tools.api import prices_to_df
 
-import json
-import ast
+# Tunable thresholds; a run can override them through metadata["parameters"]
+RISK_PARAMETERS = {
+    "max_position_fraction": 0.25,   # Largest position as a share of total portfolio value
+    "low_confidence": 0.30,          # Any analyst below this confidence adds a risk penalty
+    "reduce_risk_score": 6,          # Risk score from which positions are reduced
+    "hold_risk_score": 8,            # Risk score from which trading stops
+}
 
 ##### Risk Management Agent #####
 def risk_management_agent(state: AgentState):
     """Evaluates portfolio risk and sets position limits based on comprehensive risk analysis."""
     show_reasoning = state["metadata"]["show_reasoning"]
+    parameters = agent_parameters(state, "risk_management_agent", RISK_PARAMETERS)
     portfolio = state["data"]["portfolio"]
     data = state["data"]
 
     prices_df = prices_to_df(data["prices"])
 
-    # Fetch messages from other agents
-    technical_message = next(msg for msg in state["messages"] if msg.name == "technical_analyst_agent")
-    fundamentals_message = next(msg for msg in state["messages"] if msg.name == "fundamentals_agent")
-    sentiment_message = next(msg for msg in state["messages"] if msg.name == "sentiment_agent")
-    valuation_message = next(msg for msg in state["messages"] if msg.name == "valuation_agent")
-    try:
-        fundamental_signals = json.loads(fundamentals_message.content)
-        technical_signals = json.loads(technical_message.content)
-        sentiment_signals = json.loads(sentiment_message.content)
-        valuation_signals = json.loads(valuation_message.content)
-    except Exception as e:
-        fundamental_signals = ast.literal_eval(fundamentals_message.content)
-        technical_signals = ast.literal_eval(technical_message.content)
-        sentiment_signals = ast.literal_eval(sentiment_message.content)
-        valuation_signals = ast.literal_eval(valuation_message.content)
-        
+    # Signals from the analyst agents
+    signals = state["signals"]
     agent_signals = {
-        "fundamental": fundamental_signals,
-        "technical": technical_signals,
-        "sentiment": sentiment_signals,
-        "valuation": valuation_signals
+        "fundamental": signals["fundamentals_agent"],
+        "technical": signals["technical_analyst_agent"],
+        "sentiment": signals["sentiment_agent"],
+        "valuation": signals["valuation_agent"]
     }
 
     # 1. Calculate Risk Metrics
@@ -74,7 +64,7 @@ def risk_management_agent(state: AgentState):
     current_stock_value = portfolio['stock'] * prices_df['close'].iloc[-1]
     total_portfolio_value = portfolio['cash'] + current_stock_value
 
-    base_position_size = total_portfolio_value * 0.25  # Start with 25% max position of total portfolio
+    base_position_size = total_portfolio_value * parameters["max_position_fraction"]  # Start with 25% max position of total portfolio
     
     if market_risk_score >= 4:
         # Reduce position for high risk
@@ -105,14 +95,11 @@ def risk_management_agent(state: AgentState):
         }
 
     # 5. Risk-Adjusted Signals Analysis
-    # Convert all confidences to numeric for proper comparison
-    def parse_confidence(conf_str):
-        return float(conf_str.replace('%', '')) / 100.0
-    low_confidence = any(parse_confidence(signal['confidence']) < 0.30 for signal in agent_signals.values())
+    low_confidence = any(signal.confidence < parameters["low_confidence"] for signal in agent_signals.values())
 
     # Check the diversity of signals. If all three differ, add to risk score
     # (signal divergence can be seen as increased uncertainty)
-    unique_signals = set(signal['signal'] for signal in agent_signals.values())
+    unique_signals = set(signal.signal for signal in agent_signals.values())
     signal_divergence = (2 if len(unique_signals) == 3 else 0)
 
     risk_score = (market_risk_score * 2)  # Market risk contributes up to ~6 points total when doubled
@@ -126,37 +113,30 @@ def risk_management_agent(state: AgentState):
     # 6. Generate Trading Action
     # If risk is very high, hold. If moderately high, consider reducing.
     # Else, follow valuation signal as a baseline.
-    if risk_score >= 8:
+    if risk_score >= parameters["hold_risk_score"]:
         trading_action = "hold"
-    elif risk_score >= 6:
+    elif risk_score >= parameters["reduce_risk_score"]:
         trading_action = "reduce"
     else:
-        trading_action = agent_signals['valuation']['signal']
+        trading_action = agent_signals['valuation'].signal
 
-    message_content = {
-        "max_position_size": float(max_position_size),
-        "risk_score": risk_score,
-        "trading_action": trading_action,
-        "risk_metrics": {
+    assessment = RiskAssessment(
+        max_position_size=float(max_position_size),
+        risk_score=risk_score,
+        trading_action=trading_action,
+        risk_metrics={
             "volatility": float(volatility),
             "value_at_risk_95": float(var_95),
             "max_drawdown": float(max_drawdown),
             "market_risk_score": market_risk_score,
             "stress_test_results": stress_test_results
         },
-        "reasoning": f"Risk Score {risk_score}/10: Market Risk={market_risk_score}, "
-                     f"Volatility={volatility:.2%}, VaR={var_95:.2%}, "
-                     f"Max Drawdown={max_drawdown:.2%}"
-    }
-
-    # Create the risk management message
-    message = HumanMessage(
-        content=json.dumps(message_content),
-        name="risk_management_agent",
+        reasoning=f"Risk Score {risk_score}/10: Market Risk={market_risk_score}, "
+                  f"Volatility={volatility:.2%}, VaR={var_95:.2%}, "
+                  f"Max Drawdown={max_drawdown:.2%}"
     )
 
     if show_reasoning:
-        show_agent_reasoning(message_content, "Risk Management Agent")
-
-    return {"messages": state["messages"] + [message]}
+        show_agent_reasoning(assessment.to_dict(), "Risk Management Agent")
 
+    return {"signals": {"risk_management_agent": assessment}}
@@ -1,9 +1,5 @@
 
-from langchain_core.messages import HumanMessage
-
-from agents.state import AgentState, show_agent_reasoning
-
-import json
+from agents.state import AgentSignal, AgentState, show_agent_reasoning
 
 ##### Sentiment Agent #####
 def sentiment_agent(state: AgentState):
@@ -37,23 +33,14 @@ def sentiment_agent(state: AgentState):
     total_signals = len(signals)
     confidence = max(bullish_signals, bearish_signals) / total_signals
 
-    message_content = {
-        "signal": overall_signal,
-        "confidence": f"{round(confidence * 100)}%",
-        "reasoning": f"Bullish signals: {bullish_signals}, Bearish signals: {bearish_signals}"
-    }
+    signal = AgentSignal(
+        overall_signal,
+        confidence,
+        {"reasoning": f"Bullish signals: {bullish_signals}, Bearish signals: {bearish_signals}"},
+    )
 
     # Print the reasoning if the flag is set
     if show_reasoning:
-        show_agent_reasoning(message_content, "Sentiment Analysis Agent")
-
-    # Create the sentiment message
-    message = HumanMessage(
-        content=json.dumps(message_content),
-        name="sentiment_agent",
-    )
+        show_agent_reasoning(signal.to_dict(), "Sentiment Analysis Agent")
 
-    return {
-        "messages": [message],
-        "data": data,
-    }
+    return {"signals": {"sentiment_agent": signal}}
@@ -1,6 +1,8 @@
-from typing import Annotated, Any, Dict, Sequence, TypedDict
+from dataclasses import dataclass
+from typing import Annotated, Any, Dict, Optional, Sequence, TypedDict
 
 import operator
+import time
 from langchain_core.messages import BaseMessage
 
 
@@ -8,11 +10,92 @@ import json
 
 
 def merge_dicts(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer for the dict channels. Nodes return only the keys they add or
+    change, so most updates are empty and leave the existing dict untouched.
+    The merge is shallow: large values such as the price bars are shared by
+    reference, never copied."""
+    if not b:
+        return a
+    if not a:
+        return b
     return {**a, **b}
 
-# Define agent state
+def format_confidence(confidence: float) -> str:
+    """Render a 0-1 confidence the way agent messages show it, e.g. "75%"."""
+    return f"{round(confidence * 100)}%"
+
+class _FrozenSlots:
+    """Copy and pickle support for frozen dataclasses that declare __slots__,
+    whose default state restore would assign to the frozen fields."""
+    __slots__ = ()
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+@dataclass(frozen=True)
+class AgentSignal(_FrozenSlots):
+    """An analyst's output: a bullish / bearish / neutral signal with a 0-1
+    confidence, plus agent-specific details (reasoning, strategy breakdown)."""
+    __slots__ = ("signal", "confidence", "details")
+    signal: str
+    confidence: float
+    details: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The agent's message shape, with confidence as a percentage string."""
+        return {"signal": self.signal, "confidence": format_confidence(self.confidence), **self.details}
+
+@dataclass(frozen=True)
+class RiskAssessment(_FrozenSlots):
+    """The risk manager's position limit and recommended action."""
+    __slots__ = ("max_position_size", "risk_score", "trading_action", "risk_metrics", "reasoning")
+    max_position_size: float
+    risk_score: int
+    trading_action: str
+    risk_metrics: Dict[str, Any]
+    reasoning: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_position_size": self.max_position_size,
+            "risk_score": self.risk_score,
+            "trading_action": self.trading_action,
+            "risk_metrics": self.risk_metrics,
+            "reasoning": self.reasoning,
+        }
+
+def agent_parameters(state, agent_name: str, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """An agent's tunable parameters: its defaults, overridden by any given in
+    metadata["parameters"][agent_name] (e.g. by a parameter sweep)."""
+    overrides = state["metadata"].get("parameters", {}).get(agent_name)
+    return {**defaults, **overrides} if overrides else defaults
+
+def time_budget(state, limit: Optional[float] = None) -> Optional[float]:
+    """Seconds an agent may still spend waiting on I/O: ``limit``, cut to
+    what is left before metadata["deadline"] (a time.monotonic() value) when
+    the run has one. Raises TimeoutError once the deadline has passed."""
+    deadline = state["metadata"].get("deadline")
+    if deadline is None:
+        return limit
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Analysis deadline exceeded")
+    return remaining if limit is None else min(limit, remaining)
+
+def render_signal(signal) -> str:
+    """JSON text of an AgentSignal or RiskAssessment, as used in LLM prompts."""
+    return json.dumps(signal.to_dict())
+
+# Define agent state. Nodes return deltas only: "messages" holds the
+# messages they add, "signals" maps agent name to its AgentSignal or
+# RiskAssessment, and "data" / "metadata" hold the keys they set.
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
+    signals: Annotated[Dict[str, Any], merge_dicts]
     data: Annotated[Dict[str, Any], merge_dicts]
     metadata: Annotated[Dict[str, Any], merge_dicts]
 
@@ -1,16 +1,78 @@
 import math
 from typing import Dict
 
-from langchain_core.messages import HumanMessage
+from agents.state import AgentSignal, AgentState, agent_parameters, format_confidence, show_agent_reasoning
 
-from agents.state import AgentState, show_agent_reasoning
-
-import json
 import pandas as pd
 import numpy as np
 
 from tools.api import prices_to_df
 
+# Weight of each strategy in the combined technical signal
+STRATEGY_WEIGHTS = {
+    'trend': 0.25,
+    'mean_reversion': 0.20,
+    'momentum': 0.25,
+    'volatility': 0.15,
+    'stat_arb': 0.15
+}
+
+
+class IndicatorContext:
+    """
+    Memoizes indicators computed over one prices_df
+
+    Every strategy pulls its indicators from the same context, so each
+    (indicator, parameters) pair is computed once per technical analysis.
+    hits / misses count how often a cached series was reused.
+    """
+
+    def __init__(self, prices_df: pd.DataFrame):
+        self.prices_df = prices_df
+        self.hits = 0
+        self.misses = 0
+        self._cache = {}
+
+    def get(self, name: str, func, *params):
+        """Return func(prices_df, *params), computing it on first use only."""
+        key = (name,) + params
+        if key in self._cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._cache[key] = func(self.prices_df, *params)
+        return self._cache[key]
+
+    def returns(self) -> pd.Series:
+        return self.get('returns', lambda df: df['close'].pct_change())
+
+    def ema(self, window: int) -> pd.Series:
+        return self.get('ema', calculate_ema, window)
+
+    def macd(self) -> tuple[pd.Series, pd.Series]:
+        return self.get('macd', calculate_macd)
+
+    def rsi(self, period: int = 14) -> pd.Series:
+        return self.get('rsi', calculate_rsi, period)
+
+    def bollinger_bands(self, window: int = 20) -> tuple[pd.Series, pd.Series]:
+        return self.get('bollinger_bands', calculate_bollinger_bands, window)
+
+    def obv(self) -> pd.Series:
+        return self.get('obv', calculate_obv)
+
+    def directional(self, period: int = 14) -> Dict[str, pd.Series]:
+        return self.get('directional', calculate_directional_indicators, period)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "computed": [
+                f"{key[0]}({', '.join(str(p) for p in key[1:])})" for key in self._cache
+            ],
+        }
+
 
 ##### Technical Analyst #####
 def technical_analyst_agent(state: AgentState):
@@ -23,212 +85,113 @@ def technical_analyst_agent(state: AgentState):
     5. Statistical Arbitrage Signals
     """
     show_reasoning = state["metadata"]["show_reasoning"]
+    parameters = agent_parameters(state, "technical_analyst_agent", {"strategy_weights": STRATEGY_WEIGHTS})
     data = state["data"]
-    prices = data["prices"]
-    prices_df = prices_to_df(prices)
-    
-    # Calculate indicators
-    # 1. MACD (Moving Average Convergence Divergence)
-    macd_line, signal_line = calculate_macd(prices_df)
-    
-    # 2. RSI (Relative Strength Index)
-    rsi = calculate_rsi(prices_df)
-    
-    # 3. Bollinger Bands (Bollinger Bands)
-    upper_band, lower_band = calculate_bollinger_bands(prices_df)
-    
-    # 4. OBV (On-Balance Volume)
-    obv = calculate_obv(prices_df)
-    
-    # Generate individual signals
-    signals = []
-    
-    # MACD signal
-    if macd_line.iloc[-2] < signal_line.iloc[-2] and macd_line.iloc[-1] > signal_line.iloc[-1]:
-        signals.append('bullish')
-    elif macd_line.iloc[-2] > signal_line.iloc[-2] and macd_line.iloc[-1] < signal_line.iloc[-1]:
-        signals.append('bearish')
-    else:
-        signals.append('neutral')
-    
-    # RSI signal
-    if rsi.iloc[-1] < 30:
-        signals.append('bullish')
-    elif rsi.iloc[-1] > 70:
-        signals.append('bearish')
+    snapshot = data.get("indicator_snapshot")
+    if snapshot is not None:
+        # Streaming backtests hand in the latest indicator values directly,
+        # so nothing is recomputed from the price history
+        indicators = None
+        strategy_signals = calculate_signals_from_snapshot(snapshot)
     else:
-        signals.append('neutral')
-    
-    # Bollinger Bands signal
-    current_price = prices_df['close'].iloc[-1]
-    if current_price < lower_band.iloc[-1]:
-        signals.append('bullish')
-    elif current_price > upper_band.iloc[-1]:
-        signals.append('bearish')
-    else:
-        signals.append('neutral')
-    
-    # OBV signal
-    obv_slope = obv.diff().iloc[-5:].mean()
-    if obv_slope > 0:
-        signals.append('bullish')
-    elif obv_slope < 0:
-        signals.append('bearish')
-    else:
-        signals.append('neutral')
-    
-    # Add reasoning collection
-    reasoning = {
-        "MACD": {
-            "signal": signals[0],
-            "details": f"MACD Line crossed {'above' if signals[0] == 'bullish' else 'below' if signals[0] == 'bearish' else 'neither above nor below'} Signal Line"
-        },
-        "RSI": {
-            "signal": signals[1],
-            "details": f"RSI is {rsi.iloc[-1]:.2f} ({'oversold' if signals[1] == 'bullish' else 'overbought' if signals[1] == 'bearish' else 'neutral'})"
-        },
-        "Bollinger": {
-            "signal": signals[2],
-            "details": f"Price is {'below lower band' if signals[2] == 'bullish' else 'above upper band' if signals[2] == 'bearish' else 'within bands'}"
-        },
-        "OBV": {
-            "signal": signals[3],
-            "details": f"OBV slope is {obv_slope:.2f} ({signals[3]})"
-        }
-    }
+        prices = data["prices"]
+        prices_df = prices_to_df(prices)
+        indicators = IndicatorContext(prices_df)
     
-    # Determine overall signal
-    bullish_signals = signals.count('bullish')
-    bearish_signals = signals.count('bearish')
-    
-    if bullish_signals > bearish_signals:
-        overall_signal = 'bullish'
-    elif bearish_signals > bullish_signals:
-        overall_signal = 'bearish'
-    else:
-        overall_signal = 'neutral'
-    
-    # Calculate confidence level based on the proportion of indicators agreeing
-    total_signals = len(signals)
-    confidence = max(bullish_signals, bearish_signals) / total_signals
-    
-    # Generate the message content
-    message_content = {
-        "signal": overall_signal,
-        "confidence": f"{round(confidence * 100)}%",
-        "reasoning": {
-            "MACD": reasoning["MACD"],
-            "RSI": reasoning["RSI"],
-            "Bollinger": reasoning["Bollinger"],
-            "OBV": reasoning["OBV"]
-        }
-    }
-
-    # 1. Trend Following Strategy
-    trend_signals = calculate_trend_signals(prices_df)
+        # 1. Trend Following Strategy
+        trend_signals = calculate_trend_signals(prices_df, indicators)
     
-    # 2. Mean Reversion Strategy
-    mean_reversion_signals = calculate_mean_reversion_signals(prices_df)
+        # 2. Mean Reversion Strategy
+        mean_reversion_signals = calculate_mean_reversion_signals(prices_df, indicators)
     
-    # 3. Momentum Strategy
-    momentum_signals = calculate_momentum_signals(prices_df)
+        # 3. Momentum Strategy
+        momentum_signals = calculate_momentum_signals(prices_df, indicators)
     
-    # 4. Volatility Strategy
-    volatility_signals = calculate_volatility_signals(prices_df)
+        # 4. Volatility Strategy
+        volatility_signals = calculate_volatility_signals(prices_df, indicators)
     
-    # 5. Statistical Arbitrage Signals
-    stat_arb_signals = calculate_stat_arb_signals(prices_df)
+        # 5. Statistical Arbitrage Signals
+        stat_arb_signals = calculate_stat_arb_signals(prices_df, indicators)
+        
+        strategy_signals = {
+            'trend': trend_signals,
+            'mean_reversion': mean_reversion_signals,
+            'momentum': momentum_signals,
+            'volatility': volatility_signals,
+            'stat_arb': stat_arb_signals
+        }
     
     # Combine all signals using a weighted ensemble approach
-    strategy_weights = {
-        'trend': 0.25,
-        'mean_reversion': 0.20,
-        'momentum': 0.25,
-        'volatility': 0.15,
-        'stat_arb': 0.15
-    }
-    
-    combined_signal = weighted_signal_combination({
-        'trend': trend_signals,
-        'mean_reversion': mean_reversion_signals,
-        'momentum': momentum_signals,
-        'volatility': volatility_signals,
-        'stat_arb': stat_arb_signals
-    }, strategy_weights)
+    combined_signal = weighted_signal_combination(strategy_signals, parameters["strategy_weights"])
     
     # Generate detailed analysis report
-    analysis_report = {
-        "signal": combined_signal['signal'],
-        "confidence": f"{round(combined_signal['confidence'] * 100)}%",
+    technical_signal = AgentSignal(combined_signal['signal'], combined_signal['confidence'], {
         "strategy_signals": {
             "trend_following": {
-                "signal": trend_signals['signal'],
-                "confidence": f"{round(trend_signals['confidence'] * 100)}%",
-                "metrics": normalize_pandas(trend_signals['metrics'])
+                "signal": strategy_signals['trend']['signal'],
+                "confidence": format_confidence(strategy_signals['trend']['confidence']),
+                "metrics": normalize_pandas(strategy_signals['trend']['metrics'])
             },
             "mean_reversion": {
-                "signal": mean_reversion_signals['signal'],
-                "confidence": f"{round(mean_reversion_signals['confidence'] * 100)}%",
-                "metrics": normalize_pandas(mean_reversion_signals['metrics'])
+                "signal": strategy_signals['mean_reversion']['signal'],
+                "confidence": format_confidence(strategy_signals['mean_reversion']['confidence']),
+                "metrics": normalize_pandas(strategy_signals['mean_reversion']['metrics'])
             },
             "momentum": {
-                "signal": momentum_signals['signal'],
-                "confidence": f"{round(momentum_signals['confidence'] * 100)}%",
-                "metrics": normalize_pandas(momentum_signals['metrics'])
+                "signal": strategy_signals['momentum']['signal'],
+                "confidence": format_confidence(strategy_signals['momentum']['confidence']),
+                "metrics": normalize_pandas(strategy_signals['momentum']['metrics'])
             },
             "volatility": {
-                "signal": volatility_signals['signal'],
-                "confidence": f"{round(volatility_signals['confidence'] * 100)}%",
-                "metrics": normalize_pandas(volatility_signals['metrics'])
+                "signal": strategy_signals['volatility']['signal'],
+                "confidence": format_confidence(strategy_signals['volatility']['confidence']),
+                "metrics": normalize_pandas(strategy_signals['volatility']['metrics'])
             },
             "statistical_arbitrage": {
-                "signal": stat_arb_signals['signal'],
-                "confidence": f"{round(stat_arb_signals['confidence'] * 100)}%",
-                "metrics": normalize_pandas(stat_arb_signals['metrics'])
+                "signal": strategy_signals['stat_arb']['signal'],
+                "confidence": format_confidence(strategy_signals['stat_arb']['confidence']),
+                "metrics": normalize_pandas(strategy_signals['stat_arb']['metrics'])
             }
         }
-    }
-
-    # Create the technical analyst message
-    message = HumanMessage(
-        content=json.dumps(analysis_report),
-        name="technical_analyst_agent",
-    )
+    })
 
     if show_reasoning:
-        show_agent_reasoning(analysis_report, "Technical Analyst")
+        show_agent_reasoning(technical_signal.to_dict(), "Technical Analyst")
+
+    if indicators is not None and state["metadata"].get("show_indicator_cache"):
+        show_agent_reasoning(indicators.stats(), "Indicator Cache")
     
-    return {
-        "messages": [message],
-        "data": data,
-    }
+    return {"signals": {"technical_analyst_agent": technical_signal}}
 
-def calculate_trend_signals(prices_df):
+def calculate_trend_signals(prices_df, indicators=None):
     """
     Advanced trend following strategy using multiple timeframes and indicators
     """
+    indicators = indicators or IndicatorContext(prices_df)
+
     # Calculate EMAs for multiple timeframes
-    ema_8 = calculate_ema(prices_df, 8)
-    ema_21 = calculate_ema(prices_df, 21)
-    ema_55 = calculate_ema(prices_df, 55)
+    ema_8 = indicators.ema(8)
+    ema_21 = indicators.ema(21)
+    ema_55 = indicators.ema(55)
     
     # Calculate ADX for trend strength
-    adx = calculate_adx(prices_df, 14)
-    
-    # Calculate Ichimoku Cloud
-    ichimoku = calculate_ichimoku(prices_df)
+    adx = indicators.directional(14)['adx']
     
+    return _trend_decision(ema_8.iloc[-1], ema_21.iloc[-1], ema_55.iloc[-1], adx.iloc[-1])
+
+def _trend_decision(ema_8, ema_21, ema_55, adx):
+    """Trend signal from the latest EMA and ADX values"""
     # Determine trend direction and strength
     short_trend = ema_8 > ema_21
     medium_trend = ema_21 > ema_55
     
     # Combine signals with confidence weighting
-    trend_strength = adx['adx'].iloc[-1] / 100.0
+    trend_strength = adx / 100.0
     
-    if short_trend.iloc[-1] and medium_trend.iloc[-1]:
+    if short_trend and medium_trend:
         signal = 'bullish'
         confidence = trend_strength
-    elif not short_trend.iloc[-1] and not medium_trend.iloc[-1]:
+    elif not short_trend and not medium_trend:
         signal = 'bearish'
         confidence = trend_strength
     else:
@@ -239,39 +202,47 @@ def calculate_trend_signals(prices_df):
         'signal': signal,
         'confidence': confidence,
         'metrics': {
-            'adx': float(adx['adx'].iloc[-1]),
+            'adx': float(adx),
             'trend_strength': float(trend_strength),
-            # 'ichimoku': ichimoku
         }
     }
 
-def calculate_mean_reversion_signals(prices_df):
+def calculate_mean_reversion_signals(prices_df, indicators=None):
     """
     Mean reversion strategy using statistical measures and Bollinger Bands
     """
+    indicators = indicators or IndicatorContext(prices_df)
+
     # Calculate z-score of price relative to moving average
     ma_50 = prices_df['close'].rolling(window=50).mean()
     std_50 = prices_df['close'].rolling(window=50).std()
-    z_score = (prices_df['close'] - ma_50) / std_50
     
     # Calculate Bollinger Bands
-    bb_upper, bb_lower = calculate_bollinger_bands(prices_df)
+    bb_upper, bb_lower = indicators.bollinger_bands(20)
     
     # Calculate RSI with multiple timeframes
-    rsi_14 = calculate_rsi(prices_df, 14)
-    rsi_28 = calculate_rsi(prices_df, 28)
+    rsi_14 = indicators.rsi(14)
+    rsi_28 = indicators.rsi(28)
+    
+    return _mean_reversion_decision(
+        prices_df['close'].iloc[-1], ma_50.iloc[-1], std_50.iloc[-1],
+        bb_upper.iloc[-1], bb_lower.iloc[-1], rsi_14.iloc[-1], rsi_28.iloc[-1]
+    )
+
+def _mean_reversion_decision(close, ma_50, std_50, bb_upper, bb_lower, rsi_14, rsi_28):
+    """Mean reversion signal from the latest close, 50-day band, Bollinger Bands and RSI values"""
+    z_score = (close - ma_50) / std_50
     
     # Mean reversion signals
-    extreme_z_score = abs(z_score.iloc[-1]) > 2
-    price_vs_bb = (prices_df['close'].iloc[-1] - bb_lower.iloc[-1]) / (bb_upper.iloc[-1] - bb_lower.iloc[-1])
+    price_vs_bb = (close - bb_lower) / (bb_upper - bb_lower)
     
     # Combine signals
-    if z_score.iloc[-1] < -2 and price_vs_bb < 0.2:
+    if z_score < -2 and price_vs_bb < 0.2:
         signal = 'bullish'
-        confidence = min(abs(z_score.iloc[-1]) / 4, 1.0)
-    elif z_score.iloc[-1] > 2 and price_vs_bb > 0.8:
+        confidence = min(abs(z_score) / 4, 1.0)
+    elif z_score > 2 and price_vs_bb > 0.8:
         signal = 'bearish'
-        confidence = min(abs(z_score.iloc[-1]) / 4, 1.0)
+        confidence = min(abs(z_score) / 4, 1.0)
     else:
         signal = 'neutral'
         confidence = 0.5
@@ -280,39 +251,49 @@ def calculate_mean_reversion_signals(prices_df):
         'signal': signal,
         'confidence': confidence,
         'metrics': {
-            'z_score': float(z_score.iloc[-1]),
+            'z_score': float(z_score),
             'price_vs_bb': float(price_vs_bb),
-            'rsi_14': float(rsi_14.iloc[-1]),
-            'rsi_28': float(rsi_28.iloc[-1])
+            'rsi_14': float(rsi_14),
+            'rsi_28': float(rsi_28)
         }
     }
 
-def calculate_momentum_signals(prices_df):
+def calculate_momentum_signals(prices_df, indicators=None):
     """
     Multi-factor momentum strategy
     """
+    indicators = indicators or IndicatorContext(prices_df)
+
     # Price momentum
-    returns = prices_df['close'].pct_change()
+    returns = indicators.returns()
     mom_1m = returns.rolling(21).sum()
     mom_3m = returns.rolling(63).sum()
     mom_6m = returns.rolling(126).sum()
     
     # Volume momentum
     volume_ma = prices_df['volume'].rolling(21).mean()
-    volume_momentum = prices_df['volume'] / volume_ma
     
     # Relative strength
     # (would compare to market/sector in real implementation)
     
+    return _momentum_decision(
+        mom_1m.iloc[-1], mom_3m.iloc[-1], mom_6m.iloc[-1],
+        prices_df['volume'].iloc[-1], volume_ma.iloc[-1]
+    )
+
+def _momentum_decision(mom_1m, mom_3m, mom_6m, volume, volume_ma):
+    """Momentum signal from the latest 1/3/6 month return sums and volume"""
+    volume_momentum = volume / volume_ma
+    
     # Calculate momentum score
     momentum_score = (
         0.4 * mom_1m +
         0.3 * mom_3m +
         0.3 * mom_6m
-    ).iloc[-1]
+    )
     
     # Volume confirmation
-    volume_confirmation = volume_momentum.iloc[-1] > 1.0
+    volume_confirmation = volume_momentum > 1.0
     
     if momentum_score > 0.05 and volume_confirmation:
         signal = 'bullish'
@@ -328,42 +309,52 @@ def calculate_momentum_signals(prices_df):
         'signal': signal,
         'confidence': confidence,
         'metrics': {
-            'momentum_1m': float(mom_1m.iloc[-1]),
-            'momentum_3m': float(mom_3m.iloc[-1]),
-            'momentum_6m': float(mom_6m.iloc[-1]),
-            'volume_momentum': float(volume_momentum.iloc[-1])
+            'momentum_1m': float(mom_1m),
+            'momentum_3m': float(mom_3m),
+            'momentum_6m': float(mom_6m),
+            'volume_momentum': float(volume_momentum)
         }
     }
 
-def calculate_volatility_signals(prices_df):
+def calculate_volatility_signals(prices_df, indicators=None):
     """
     Volatility-based trading strategy
     """
+    indicators = indicators or IndicatorContext(prices_df)
+
     # Calculate various volatility metrics
-    returns = prices_df['close'].pct_change()
+    returns = indicators.returns()
     
     # Historical volatility
     hist_vol = returns.rolling(21).std() * math.sqrt(252)
     
     # Volatility regime detection
     vol_ma = hist_vol.rolling(63).mean()
+    vol_std = hist_vol.rolling(63).std()
+    
+    # ATR
+    atr = indicators.directional(14)['atr']
+    
+    return _volatility_decision(
+        hist_vol.iloc[-1], vol_ma.iloc[-1], vol_std.iloc[-1],
+        atr.iloc[-1], prices_df['close'].iloc[-1]
+    )
+
+def _volatility_decision(hist_vol, vol_ma, vol_std, atr, close):
+    """Volatility signal from the latest historical volatility, its 63-day mean/std and ATR"""
     vol_regime = hist_vol / vol_ma
     
     # Volatility mean reversion
-    vol_z_score = (hist_vol - vol_ma) / hist_vol.rolling(63).std()
+    vol_z = (hist_vol - vol_ma) / vol_std
     
     # ATR ratio
-    atr = calculate_atr(prices_df)
-    atr_ratio = atr / prices_df['close']
+    atr_ratio = atr / close
     
     # Generate signal based on volatility regime
-    current_vol_regime = vol_regime.iloc[-1]
-    vol_z = vol_z_score.iloc[-1]
-    
-    if current_vol_regime < 0.8 and vol_z < -1:
+    if vol_regime < 0.8 and vol_z < -1:
         signal = 'bullish'  # Low vol regime, potential for expansion
         confidence = min(abs(vol_z) / 3, 1.0)
-    elif current_vol_regime > 1.2 and vol_z > 1:
+    elif vol_regime > 1.2 and vol_z > 1:
         signal = 'bearish'  # High vol regime, potential for contraction
         confidence = min(abs(vol_z) / 3, 1.0)
     else:
@@ -374,19 +365,21 @@ def calculate_volatility_signals(prices_df):
         'signal': signal,
         'confidence': confidence,
         'metrics': {
-            'historical_volatility': float(hist_vol.iloc[-1]),
-            'volatility_regime': float(current_vol_regime),
+            'historical_volatility': float(hist_vol),
+            'volatility_regime': float(vol_regime),
             'volatility_z_score': float(vol_z),
-            'atr_ratio': float(atr_ratio.iloc[-1])
+            'atr_ratio': float(atr_ratio)
         }
     }
 
-def calculate_stat_arb_signals(prices_df):
+def calculate_stat_arb_signals(prices_df, indicators=None):
     """
     Statistical arbitrage signals based on price action analysis
     """
+    indicators = indicators or IndicatorContext(prices_df)
+
     # Calculate price distribution statistics
-    returns = prices_df['close'].pct_change()
+    returns = indicators.returns()
     
     # Skewness and kurtosis
     skew = returns.rolling(63).skew()
@@ -398,11 +391,15 @@ def calculate_stat_arb_signals(prices_df):
     # Correlation analysis
     # (would include correlation with related securities in real implementation)
     
+    return _stat_arb_decision(hurst, skew.iloc[-1], kurt.iloc[-1])
+
+def _stat_arb_decision(hurst, skew, kurt):
+    """Statistical arbitrage signal from the Hurst exponent and the latest return skew/kurtosis"""
     # Generate signal based on statistical properties
-    if hurst < 0.4 and skew.iloc[-1] > 1:
+    if hurst < 0.4 and skew > 1:
         signal = 'bullish'
         confidence = (0.5 - hurst) * 2
-    elif hurst < 0.4 and skew.iloc[-1] < -1:
+    elif hurst < 0.4 and skew < -1:
         signal = 'bearish'
         confidence = (0.5 - hurst) * 2
     else:
@@ -414,11 +411,193 @@ def calculate_stat_arb_signals(prices_df):
         'confidence': confidence,
         'metrics': {
             'hurst_exponent': float(hurst),
-            'skewness': float(skew.iloc[-1]),
-            'kurtosis': float(kurt.iloc[-1])
+            'skewness': float(skew),
+            'kurtosis': float(kurt)
         }
     }
 
+def calculate_signals_from_snapshot(snapshot: Dict[str, float]) -> Dict[str, dict]:
+    """
+    Run all five strategies on the latest indicator values of a TechnicalIndicatorStream
+
+    Args:
+        snapshot: Output of TechnicalIndicatorStream.snapshot()
+
+    Returns:
+        Dictionary of strategy name to signal, keyed like STRATEGY_WEIGHTS
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'trend': _trend_decision(
+                snapshot['ema_8'], snapshot['ema_21'], snapshot['ema_55'], snapshot['adx']
+            ),
+            'mean_reversion': _mean_reversion_decision(
+                snapshot['close'], snapshot['ma_50'], snapshot['std_50'],
+                snapshot['bb_upper'], snapshot['bb_lower'], snapshot['rsi_14'], snapshot['rsi_28']
+            ),
+            'momentum': _momentum_decision(
+                snapshot['mom_1m'], snapshot['mom_3m'], snapshot['mom_6m'],
+                snapshot['volume'], snapshot['volume_ma_21']
+            ),
+            'volatility': _volatility_decision(
+                snapshot['hist_vol'], snapshot['vol_ma_63'], snapshot['vol_std_63'],
+                snapshot['atr'], snapshot['close']
+            ),
+            'stat_arb': _stat_arb_decision(snapshot['hurst'], snapshot['skew_63'], snapshot['kurt_63']),
+        }
+
+def _signal_labels(bullish, bearish) -> np.ndarray:
+    """Map aligned bullish / bearish masks to signal labels"""
+    return np.select([bullish, bearish], ['bullish', 'bearish'], default='neutral')
+
+def calculate_trend_signal_series(prices_df, indicators=None) -> pd.DataFrame:
+    """
+    Trend following signal for every bar of prices_df
+
+    Row i holds what calculate_trend_signals returns for prices_df.iloc[:i + 1].
+    """
+    indicators = indicators or IndicatorContext(prices_df)
+    ema_8 = indicators.ema(8)
+    ema_21 = indicators.ema(21)
+    ema_55 = indicators.ema(55)
+    adx = indicators.directional(14)['adx']
+
+    short_trend = ema_8 > ema_21
+    medium_trend = ema_21 > ema_55
+    trend_strength = adx / 100.0
+    bullish = short_trend & medium_trend
+    bearish = ~short_trend & ~medium_trend
+
+    return pd.DataFrame({
+        'signal': _signal_labels(bullish, bearish),
+        'confidence': trend_strength.where(bullish | bearish, 0.5),
+        'adx': adx,
+        'trend_strength': trend_strength,
+    }, index=prices_df.index)
+
+def calculate_mean_reversion_signal_series(prices_df, indicators=None) -> pd.DataFrame:
+    """
+    Mean reversion signal for every bar of prices_df
+
+    Row i holds what calculate_mean_reversion_signals returns for prices_df.iloc[:i + 1].
+    """
+    indicators = indicators or IndicatorContext(prices_df)
+    close = prices_df['close']
+    z_score = (close - close.rolling(window=50).mean()) / close.rolling(window=50).std()
+    bb_upper, bb_lower = indicators.bollinger_bands(20)
+    price_vs_bb = (close - bb_lower) / (bb_upper - bb_lower)
+
+    bullish = (z_score < -2) & (price_vs_bb < 0.2)
+    bearish = (z_score > 2) & (price_vs_bb > 0.8)
+
+    return pd.DataFrame({
+        'signal': _signal_labels(bullish, bearish),
+        'confidence': np.minimum(z_score.abs() / 4, 1.0).where(bullish | bearish, 0.5),
+        'z_score': z_score,
+        'price_vs_bb': price_vs_bb,
+        'rsi_14': indicators.rsi(14),
+        'rsi_28': indicators.rsi(28),
+    }, index=prices_df.index)
+
+def calculate_momentum_signal_series(prices_df, indicators=None) -> pd.DataFrame:
+    """
+    Momentum signal for every bar of prices_df
+
+    Row i holds what calculate_momentum_signals returns for prices_df.iloc[:i + 1].
+    """
+    indicators = indicators or IndicatorContext(prices_df)
+    returns = indicators.returns()
+    mom_1m = returns.rolling(21).sum()
+    mom_3m = returns.rolling(63).sum()
+    mom_6m = returns.rolling(126).sum()
+    volume_momentum = prices_df['volume'] / prices_df['volume'].rolling(21).mean()
+
+    momentum_score = 0.4 * mom_1m + 0.3 * mom_3m + 0.3 * mom_6m
+    volume_confirmation = volume_momentum > 1.0
+    bullish = (momentum_score > 0.05) & volume_confirmation
+    bearish = (momentum_score < -0.05) & volume_confirmation
+
+    return pd.DataFrame({
+        'signal': _signal_labels(bullish, bearish),
+        'confidence': np.minimum(momentum_score.abs() * 5, 1.0).where(bullish | bearish, 0.5),
+        'momentum_1m': mom_1m,
+        'momentum_3m': mom_3m,
+        'momentum_6m': mom_6m,
+        'volume_momentum': volume_momentum,
+    }, index=prices_df.index)
+
+def calculate_volatility_signal_series(prices_df, indicators=None) -> pd.DataFrame:
+    """
+    Volatility signal for every bar of prices_df
+
+    Row i holds what calculate_volatility_signals returns for prices_df.iloc[:i + 1].
+    """
+    indicators = indicators or IndicatorContext(prices_df)
+    hist_vol = indicators.returns().rolling(21).std() * math.sqrt(252)
+    vol_ma = hist_vol.rolling(63).mean()
+    vol_regime = hist_vol / vol_ma
+    vol_z = (hist_vol - vol_ma) / hist_vol.rolling(63).std()
+    atr_ratio = indicators.directional(14)['atr'] / prices_df['close']
+
+    bullish = (vol_regime < 0.8) & (vol_z < -1)
+    bearish = (vol_regime > 1.2) & (vol_z > 1)
+
+    return pd.DataFrame({
+        'signal': _signal_labels(bullish, bearish),
+        'confidence': np.minimum(vol_z.abs() / 3, 1.0).where(bullish | bearish, 0.5),
+        'historical_volatility': hist_vol,
+        'volatility_regime': vol_regime,
+        'volatility_z_score': vol_z,
+        'atr_ratio': atr_ratio,
+    }, index=prices_df.index)
+
+def calculate_stat_arb_signal_series(prices_df, indicators=None, hurst_window: int = None) -> pd.DataFrame:
+    """
+    Statistical arbitrage signal for every bar of prices_df
+
+    By default the Hurst exponent is expanding, so row i sees the same closes
+    as calculate_stat_arb_signals on prices_df.iloc[:i + 1]. With hurst_window
+    it is computed over that many trailing closes instead.
+    """
+    indicators = indicators or IndicatorContext(prices_df)
+    returns = indicators.returns()
+    skew = returns.rolling(63).skew()
+    kurt = returns.rolling(63).kurt()
+    close = prices_df['close'].to_numpy(dtype=float)
+    if hurst_window is None:
+        hurst = calculate_expanding_hurst_exponent(close)
+    else:
+        hurst = calculate_rolling_hurst_exponent(close, hurst_window)
+    # Too short a history counts as a random walk, as in calculate_hurst_exponent
+    hurst = pd.Series(hurst, index=prices_df.index).fillna(0.5)
+
+    bullish = (hurst < 0.4) & (skew > 1)
+    bearish = (hurst < 0.4) & (skew < -1)
+
+    return pd.DataFrame({
+        'signal': _signal_labels(bullish, bearish),
+        'confidence': ((0.5 - hurst) * 2).where(bullish | bearish, 0.5),
+        'hurst_exponent': hurst,
+        'skewness': skew,
+        'kurtosis': kurt,
+    }, index=prices_df.index)
+
+def calculate_strategy_signal_series(prices_df, indicators=None) -> Dict[str, pd.DataFrame]:
+    """
+    Run all five strategies in series mode over one shared IndicatorContext
+
+    Returns:
+        Dictionary of strategy name to per-bar signal DataFrame, keyed like STRATEGY_WEIGHTS
+    """
+    indicators = indicators or IndicatorContext(prices_df)
+    return {
+        'trend': calculate_trend_signal_series(prices_df, indicators),
+        'mean_reversion': calculate_mean_reversion_signal_series(prices_df, indicators),
+        'momentum': calculate_momentum_signal_series(prices_df, indicators),
+        'volatility': calculate_volatility_signal_series(prices_df, indicators),
+        'stat_arb': calculate_stat_arb_signal_series(prices_df, indicators),
+    }
+
 def weighted_signal_combination(signals, weights):
     """
     Combines multiple trading signals using a weighted approach
@@ -460,6 +639,62 @@ def weighted_signal_combination(signals, weights):
         'confidence': abs(final_score)
     }
 
+def weighted_signal_combination_series(signals, weights) -> pd.DataFrame:
+    """
+    Column-wise weighted_signal_combination over per-bar strategy signals
+
+    Args:
+        signals: Dictionary of strategy name to DataFrame with 'signal' and 'confidence' columns
+        weights: Dictionary of strategy name to weight
+
+    Returns:
+        DataFrame with the combined 'signal' and 'confidence' for every bar
+    """
+    signal_values = {
+        'bullish': 1,
+        'neutral': 0,
+        'bearish': -1
+    }
+
+    index = next(iter(signals.values())).index
+    weighted_sum = np.zeros(len(index))
+    total_confidence = np.zeros(len(index))
+
+    for strategy, signal in signals.items():
+        numeric_signal = signal['signal'].map(signal_values).to_numpy(dtype=float)
+        weight = weights[strategy]
+        confidence = signal['confidence'].to_numpy(dtype=float)
+
+        weighted_sum += numeric_signal * weight * confidence
+        total_confidence += weight * confidence
+
+    # Normalize the weighted sum; bars without positive total confidence score 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        final_score = np.where(total_confidence > 0, weighted_sum / total_confidence, 0.0)
+
+    return pd.DataFrame({
+        'signal': _signal_labels(final_score > 0.2, final_score < -0.2),
+        'confidence': np.abs(final_score),
+    }, index=index)
+
+def calculate_technical_signal_series(prices_df, weights=None) -> pd.DataFrame:
+    """
+    Combined technical signal for every bar of prices_df
+
+    Equivalent to running the technical analyst once per bar on the history
+    up to that bar, but computed in a single vectorized pass.
+
+    Args:
+        prices_df: DataFrame with OHLCV data
+        weights: Strategy weights, defaults to STRATEGY_WEIGHTS
+
+    Returns:
+        DataFrame with the combined 'signal' and 'confidence' for every bar
+    """
+    return weighted_signal_combination_series(
+        calculate_strategy_signal_series(prices_df), weights or STRATEGY_WEIGHTS
+    )
+
 def normalize_pandas(obj):
     """Convert pandas Series/DataFrames to primitive Python types"""
     if isinstance(obj, pd.Series):
@@ -512,6 +747,51 @@ def calculate_ema(df: pd.DataFrame, window: int) -> pd.Series:
     """
     return df['close'].ewm(span=window, adjust=False).mean()
 
+def calculate_directional_indicators(df: pd.DataFrame, period: int = 14) -> Dict[str, pd.Series]:
+    """
+    Calculate ADX, +DI, -DI and ATR from a single true range / directional movement pass
+
+    Works on the raw OHLC arrays and never modifies df.
+
+    Args:
+        df: DataFrame with OHLC data
+        period: Period for the smoothing windows
+
+    Returns:
+        Dictionary with 'adx', '+di', '-di' and 'atr' Series
+    """
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    close = df['close'].to_numpy(dtype=float)
+    prev_high = np.concatenate(([np.nan], high[:-1]))
+    prev_low = np.concatenate(([np.nan], low[:-1]))
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+
+    # True Range: the largest of the three ranges, ignoring the missing
+    # previous close on the first bar
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    # Directional Movement
+    up_move = high - prev_high
+    down_move = prev_low - low
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+
+    tr_ewm = pd.Series(true_range).ewm(span=period).mean().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * (pd.Series(plus_dm).ewm(span=period).mean().to_numpy() / tr_ewm)
+        minus_di = 100 * (pd.Series(minus_dm).ewm(span=period).mean().to_numpy() / tr_ewm)
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx = pd.Series(dx).ewm(span=period).mean().to_numpy()
+    atr = pd.Series(true_range).rolling(period).mean().to_numpy()
+
+    return {
+        'adx': pd.Series(adx, index=df.index),
+        '+di': pd.Series(plus_di, index=df.index),
+        '-di': pd.Series(minus_di, index=df.index),
+        'atr': pd.Series(atr, index=df.index),
+    }
+
 def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     """
     Calculate Average Directional Index (ADX)
@@ -523,36 +803,8 @@ def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     Returns:
         DataFrame with ADX values
     """
-    # Calculate True Range
-    df['high_low'] = df['high'] - df['low']
-    df['high_close'] = abs(df['high'] - df['close'].shift())
-    df['low_close'] = abs(df['low'] - df['close'].shift())
-    df['tr'] = df[['high_low', 'high_close', 'low_close']].max(axis=1)
-    
-    # Calculate Directional Movement
-    df['up_move'] = df['high'] - df['high'].shift()
-    df['down_move'] = df['low'].shift() - df['low']
-    
-    df['plus_dm'] = np.where(
-        (df['up_move'] > df['down_move']) & (df['up_move'] > 0),
-        df['up_move'],
-        0
-    )
-    df['minus_dm'] = np.where(
-        (df['down_move'] > df['up_move']) & (df['down_move'] > 0),
-        df['down_move'],
-        0
-    )
-    
-    # Calculate ADX
-    df['+di'] = 100 * (df['plus_dm'].ewm(span=period).mean() / 
-                       df['tr'].ewm(span=period).mean())
-    df['-di'] = 100 * (df['minus_dm'].ewm(span=period).mean() / 
-                       df['tr'].ewm(span=period).mean())
-    df['dx'] = 100 * abs(df['+di'] - df['-di']) / (df['+di'] + df['-di'])
-    df['adx'] = df['dx'].ewm(span=period).mean()
-    
-    return df[['adx', '+di', '-di']]
+    indicators = calculate_directional_indicators(df, period)
+    return pd.DataFrame({key: indicators[key] for key in ['adx', '+di', '-di']})
 
 def calculate_ichimoku(df: pd.DataFrame) -> Dict[str, pd.Series]:
     """
@@ -604,49 +856,136 @@ def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     Returns:
         pd.Series: ATR values
     """
-    high_low = df['high'] - df['low']
-    high_close = abs(df['high'] - df['close'].shift())
-    low_close = abs(df['low'] - df['close'].shift())
-    
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = ranges.max(axis=1)
-    
-    return true_range.rolling(period).mean()
+    return calculate_directional_indicators(df, period)['atr']
+
+def _hurst_slope(log_tau: np.ndarray, lags: np.ndarray) -> np.ndarray:
+    """Least-squares slope of log_tau (last axis) against log(lags), as np.polyfit(deg=1) gives"""
+    log_lags = np.log(lags)
+    centered_lags = log_lags - log_lags.mean()
+    centered_tau = log_tau - log_tau.mean(axis=-1, keepdims=True)
+    return centered_tau @ centered_lags / (centered_lags @ centered_lags)
 
-def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 20) -> float:
+def _log_tau(variance: np.ndarray) -> np.ndarray:
+    # Add small epsilon to avoid log(0)
+    return np.log(np.maximum(1e-8, np.sqrt(np.sqrt(np.maximum(variance, 0)))))
+
+def calculate_hurst_exponent(price_series, max_lag: int = 20) -> float:
     """
     Calculate Hurst Exponent to determine long-term memory of time series
     H < 0.5: Mean reverting series
     H = 0.5: Random walk
     H > 0.5: Trending series
-    
+
+    The lagged differences of every lag are summarised in one pass: their
+    sums come from a prefix sum and their sums of squares from an FFT
+    autocorrelation, so the cost is O(n log n) whatever max_lag is.
+    Prices are taken positionally; a Series index plays no part.
+
     Args:
         price_series: Array-like price data
         max_lag: Maximum lag for R/S calculation
-    
+
     Returns:
-        float: Hurst exponent
+        float: Hurst exponent, or 0.5 (random walk) if there are too few finite prices
     """
-    lags = range(2, max_lag)
-    # Add small epsilon to avoid log(0)
-    tau = [max(1e-8, np.sqrt(np.std(np.subtract(price_series[lag:], price_series[:-lag])))) for lag in lags]
-    
-    # Return the Hurst exponent from linear fit
-    try:
-        reg = np.polyfit(np.log(lags), np.log(tau), 1)
-        return reg[0] # Hurst exponent is the slope
-    except (ValueError, RuntimeWarning):
-        # Return 0.5 (random walk) if calculation fails
+    prices = np.asarray(price_series, dtype=float)
+    n = len(prices)
+    if n <= max_lag or not np.isfinite(prices).all():
         return 0.5
 
+    # Centre the prices so the sums of squares below stay well conditioned
+    x = prices - prices.mean()
+    lags = np.arange(2, max_lag)
+    count = n - lags
+    prefix = np.concatenate(([0.0], np.cumsum(x)))
+    prefix_sq = np.concatenate(([0.0], np.cumsum(x * x)))
+    spectrum = np.fft.rfft(x, 2 * n)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), 2 * n)[lags]
+
+    # Sum and sum of squares of x[lag:] - x[:-lag] for every lag
+    diff_sum = (prefix[n] - prefix[lags]) - prefix[n - lags]
+    diff_sq = (prefix_sq[n] - prefix_sq[lags]) + prefix_sq[n - lags] - 2 * autocorr
+    variance = diff_sq / count - (diff_sum / count) ** 2
+
+    # Return the Hurst exponent from linear fit
+    return float(_hurst_slope(_log_tau(variance), lags))
+
+def calculate_rolling_hurst_exponent(prices, window: int, max_lag: int = 20) -> np.ndarray:
+    """
+    Hurst exponent over the trailing `window` prices at every bar
+
+    Args:
+        prices: Price array in time order
+        window: Number of prices in each window, must exceed max_lag
+        max_lag: Maximum lag for R/S calculation
+
+    Returns:
+        np.ndarray: Hurst exponent per bar, NaN until `window` prices are available
+    """
+    if window <= max_lag:
+        raise ValueError("window must be larger than max_lag")
+    prices = np.asarray(prices, dtype=float)
+    lags = np.arange(2, max_lag)
+    log_tau = np.full((len(prices), len(lags)), np.nan)
+    for j, lag in enumerate(lags):
+        diffs = prices[lag:] - prices[:-lag]
+        # A window ending at bar i holds window - lag of these differences
+        count = window - lag
+        if len(diffs) < count:
+            continue
+        prefix = np.concatenate(([0.0], np.cumsum(diffs)))
+        prefix_sq = np.concatenate(([0.0], np.cumsum(diffs * diffs)))
+        mean = (prefix[count:] - prefix[:-count]) / count
+        mean_sq = (prefix_sq[count:] - prefix_sq[:-count]) / count
+        log_tau[window - 1:, j] = _log_tau(mean_sq - mean * mean)
+    return _hurst_slope(log_tau, lags)
+
+def calculate_expanding_hurst_exponent(prices, max_lag: int = 20) -> np.ndarray:
+    """
+    Hurst exponent of prices[:i + 1] for every i, in one pass per lag
+
+    The lagged-difference standard deviations come from cumulative sums, and
+    the log-log regression slope is solved for all bars at once.
+
+    Args:
+        prices: Price array in time order
+        max_lag: Maximum lag for R/S calculation
+
+    Returns:
+        np.ndarray: Hurst exponent per bar, NaN until more than max_lag prices are available
+    """
+    prices = np.asarray(prices, dtype=float)
+    lags = np.arange(2, max_lag)
+    log_tau = np.full((len(prices), len(lags)), np.nan)
+    for j, lag in enumerate(lags):
+        diffs = prices[lag:] - prices[:-lag]
+        if len(diffs) == 0:
+            continue
+        count = np.arange(1, len(diffs) + 1)
+        mean = np.cumsum(diffs) / count
+        log_tau[lag:, j] = _log_tau(np.cumsum(diffs * diffs) / count - mean * mean)
+    hurst = _hurst_slope(log_tau, lags)
+    hurst[:max_lag] = np.nan
+    return hurst
+
 def calculate_obv(prices_df: pd.DataFrame) -> pd.Series:
-    obv = [0]
-    for i in range(1, len(prices_df)):
-        if prices_df['close'].iloc[i] > prices_df['close'].iloc[i - 1]:
-            obv.append(obv[-1] + prices_df['volume'].iloc[i])
-        elif prices_df['close'].iloc[i] < prices_df['close'].iloc[i - 1]:
-            obv.append(obv[-1] - prices_df['volume'].iloc[i])
-        else:
-            obv.append(obv[-1])
-    prices_df['OBV'] = obv
-    return prices_df['OBV']
+    """
+    Calculate On-Balance Volume without modifying prices_df
+
+    Each bar adds its volume when the close rises, subtracts it when the
+    close falls and leaves OBV unchanged otherwise.
+
+    Args:
+        prices_df: DataFrame with close and volume columns
+
+    Returns:
+        pd.Series: OBV values, starting at 0
+    """
+    close = prices_df['close'].to_numpy()
+    volume = prices_df['volume'].to_numpy()
+    if len(close) == 0:
+        return pd.Series([], index=prices_df.index, name='OBV', dtype=volume.dtype)
+    delta = np.diff(close)
+    signed_volume = np.where(delta > 0, volume[1:], np.where(delta < 0, -volume[1:], 0))
+    obv = np.concatenate(([0], signed_volume)).cumsum()
+    return pd.Series(obv, index=prices_df.index, name='OBV')
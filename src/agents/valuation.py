@@ -1,10 +1,18 @@
-from langchain_core.messages import HumanMessage
-from agents.state import AgentState, show_agent_reasoning
-import json
+from agents.state import AgentSignal, AgentState, agent_parameters, show_agent_reasoning
+
+# Tunable rates; a run can override them through metadata["parameters"]
+VALUATION_PARAMETERS = {
+    "discount_rate": 0.10,         # DCF discount rate
+    "terminal_growth_rate": 0.03,  # DCF terminal growth
+    "required_return": 0.15,       # Owner earnings discount rate
+    "margin_of_safety": 0.25,
+    "signal_threshold": 0.15,      # Valuation gap needed for a bullish / bearish signal
+}
 
 def valuation_agent(state: AgentState):
     """Performs detailed valuation analysis using multiple methodologies."""
     show_reasoning = state["metadata"]["show_reasoning"]
+    parameters = agent_parameters(state, "valuation_agent", VALUATION_PARAMETERS)
     data = state["data"]
     metrics = data["financial_metrics"][0]
     current_financial_line_item = data["financial_line_items"][0]
@@ -23,16 +31,16 @@ def valuation_agent(state: AgentState):
         capex=current_financial_line_item.get('capital_expenditure'),
         working_capital_change=working_capital_change,
         growth_rate=metrics["earnings_growth"],
-        required_return=0.15,
-        margin_of_safety=0.25
+        required_return=parameters["required_return"],
+        margin_of_safety=parameters["margin_of_safety"]
     )
     
     # DCF Valuation
     dcf_value = calculate_intrinsic_value(
         free_cash_flow=current_financial_line_item.get('free_cash_flow'),
         growth_rate=metrics["earnings_growth"],
-        discount_rate=0.10,
-        terminal_growth_rate=0.03,
+        discount_rate=parameters["discount_rate"],
+        terminal_growth_rate=parameters["terminal_growth_rate"],
         num_years=5,
     )
     
@@ -41,41 +49,30 @@ def valuation_agent(state: AgentState):
     owner_earnings_gap = (owner_earnings_value - market_cap) / market_cap
     valuation_gap = (dcf_gap + owner_earnings_gap) / 2
 
-    if valuation_gap > 0.15:  # More than 15% undervalued
+    threshold = parameters["signal_threshold"]
+    if valuation_gap > threshold:  # More than 15% undervalued
         signal = 'bullish'
-    elif valuation_gap < -0.15:  # More than 15% overvalued
+    elif valuation_gap < -threshold:  # More than 15% overvalued
         signal = 'bearish'
     else:
         signal = 'neutral'
 
     reasoning["dcf_analysis"] = {
-        "signal": "bullish" if dcf_gap > 0.15 else "bearish" if dcf_gap < -0.15 else "neutral",
+        "signal": "bullish" if dcf_gap > threshold else "bearish" if dcf_gap < -threshold else "neutral",
         "details": f"Intrinsic Value: ${dcf_value:,.2f}, Market Cap: ${market_cap:,.2f}, Gap: {dcf_gap:.1%}"
     }
 
     reasoning["owner_earnings_analysis"] = {
-        "signal": "bullish" if owner_earnings_gap > 0.15 else "bearish" if owner_earnings_gap < -0.15 else "neutral",
+        "signal": "bullish" if owner_earnings_gap > threshold else "bearish" if owner_earnings_gap < -threshold else "neutral",
         "details": f"Owner Earnings Value: ${owner_earnings_value:,.2f}, Market Cap: ${market_cap:,.2f}, Gap: {owner_earnings_gap:.1%}"
     }
 
-    message_content = {
-        "signal": signal,
-        "confidence": f"{abs(valuation_gap):.0%}",
-        "reasoning": reasoning
-    }
-
-    message = HumanMessage(
-        content=json.dumps(message_content),
-        name="valuation_agent",
-    )
+    valuation_signal = AgentSignal(signal, abs(valuation_gap), {"reasoning": reasoning})
 
     if show_reasoning:
-        show_agent_reasoning(message_content, "Valuation Analysis Agent")
+        show_agent_reasoning(valuation_signal.to_dict(), "Valuation Analysis Agent")
 
-    return {
-        "messages": [message],
-        "data": data,
-    }
+    return {"signals": {"valuation_agent": valuation_signal}}
 
 def calculate_owner_earnings_value(
     net_income: float,
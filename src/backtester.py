@@ -1,13 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from pydantic import ValidationError
 
+from agents.indicator_stream import TechnicalIndicatorStream
+from agents.portfolio_manager import PortfolioDecision
+import metrics
 from main import run_hedge_fund
-from tools.api import get_price_data
+from simulation import (
+    ACTION_CODES,
+    BUY,
+    SELL,
+    align_prices,
+    execute_portfolio_day,
+    simulate_portfolio,
+    simulate_trades,
+)
+from tools.api import get_price_data, get_price_matrix, prefetch_prices
+
+# Days of history fed to the indicator stream before the first backtest day,
+# enough for the 6-month momentum and 63-day volatility windows to fill
+STREAMING_WARMUP_DAYS = 365
 
 class Backtester:
-    def __init__(self, agent, ticker, start_date, end_date, initial_capital):
+    def __init__(self, agent, ticker, start_date, end_date, initial_capital, streaming=False, prices=None):
         self.agent = agent
         self.ticker = ticker
         self.start_date = start_date
@@ -15,16 +34,22 @@ class Backtester:
         self.initial_capital = initial_capital
         self.portfolio = {"cash": initial_capital, "stock": 0}
         self.portfolio_values = []
+        # When streaming, technical indicators are updated one bar per day
+        # and passed to the agent instead of being recomputed every day
+        self.streaming = streaming
+        # Optional PriceBars covering the lookback and backtest window; when
+        # given, the price history is not loaded from the price store
+        self.prices = prices
 
-    def parse_action(self, agent_output):
+    @staticmethod
+    def parse_action(agent_output):
+        # The portfolio manager emits a PortfolioDecision as JSON
         try:
-            # Expect JSON output from agent
-            import json
-            decision = json.loads(agent_output)
-            return decision["action"], decision["quantity"]
-        except:
+            decision = PortfolioDecision.model_validate_json(agent_output)
+        except ValidationError:
             print(f"Error parsing action: {agent_output}")
             return "hold", 0
+        return decision.action, decision.quantity
 
     def execute_trade(self, action, quantity, current_price):
         """Validate and execute trades based on portfolio constraints"""
@@ -52,26 +77,61 @@ class Backtester:
         return 0
 
     def run_backtest(self):
-        dates = pd.date_range(self.start_date, self.end_date, freq="B")
+        start = pd.Timestamp(self.start_date)
+        end = pd.Timestamp(self.end_date)
+
+        # Load the full lookback + backtest window once; it supplies the
+        # trading calendar and each day's close, and the agents' daily
+        # sliding windows below are served from the local price store.
+        lookback_days = STREAMING_WARMUP_DAYS if self.streaming else 30
+        history_start = (start - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
+        if self.prices is not None:
+            history = self.prices.between(history_start, end.strftime("%Y-%m-%d")).to_df()
+        else:
+            prefetch_prices(self.ticker, history_start, end.strftime("%Y-%m-%d"))
+            history = get_price_data(self.ticker, history_start, end.strftime("%Y-%m-%d"))
+        history_dates = history.index.strftime("%Y-%m-%d")
+        closes = history["close"].to_numpy()
+
+        # Only days with a bar are traded: a business day without one (a
+        # holiday) would otherwise be priced at the previous close
+        trading_days = [
+            i for i, day in enumerate(history_dates)
+            if start.strftime("%Y-%m-%d") <= day <= end.strftime("%Y-%m-%d")
+        ]
+
+        if self.streaming:
+            bars = history[["open", "high", "low", "close", "volume"]].to_numpy(dtype=float)
+            stream = TechnicalIndicatorStream()
+            next_bar = 0
 
         print("\nStarting backtest...")
         print(f"{'Date':<12} {'Ticker':<6} {'Action':<6} {'Quantity':>8} {'Price':>8} {'Cash':>12} {'Stock':>8} {'Total Value':>12}")
         print("-" * 100)
 
-        for current_date in dates:
+        for i in trading_days:
+            current_date = pd.Timestamp(history_dates[i])
             lookback_start = (current_date - timedelta(days=30)).strftime("%Y-%m-%d")
-            current_date_str = current_date.strftime("%Y-%m-%d")
+            current_date_str = history_dates[i]
+
+            agent_kwargs = {}
+            if self.streaming:
+                # Feed every bar up to and including the current day
+                while next_bar <= i:
+                    stream.update(*bars[next_bar])
+                    next_bar += 1
+                agent_kwargs["indicator_snapshot"] = stream.snapshot()
 
             agent_output = self.agent(
                 ticker=self.ticker,
                 start_date=lookback_start,
                 end_date=current_date_str,
-                portfolio=self.portfolio
+                portfolio=self.portfolio,
+                **agent_kwargs
             )
 
             action, quantity = self.parse_action(agent_output)
-            df = get_price_data(self.ticker, lookback_start, current_date_str)
-            current_price = df.iloc[-1]['close']
+            current_price = closes[i]
 
             # Execute the trade with validation
             executed_quantity = self.execute_trade(action, quantity, current_price)
@@ -88,44 +148,207 @@ class Backtester:
 
             # Record the portfolio value
             self.portfolio_values.append(
-                {"Date": current_date, "Portfolio Value": total_value}
+                {
+                    "Date": current_date,
+                    "Portfolio Value": total_value,
+                    "Cash": self.portfolio["cash"],
+                    "Traded Value": executed_quantity * current_price,
+                }
             )
 
-    def analyze_performance(self):
+    def simulate(self, decisions: pd.DataFrame):
+        """Replay precomputed decisions without calling the agent each day.
+
+        ``decisions`` is indexed by date with "action" and "quantity" columns,
+        e.g. derived from calculate_technical_signal_series. Fills follow
+        execute_trade's rules; dates without a price bar trade nothing.
+        Returns the SimulationResult and leaves the backtester ready for
+        analyze_performance.
+        """
+        dates = pd.DatetimeIndex(decisions.index)
+        history = get_price_data(self.ticker, dates[0].strftime("%Y-%m-%d"), dates[-1].strftime("%Y-%m-%d"))
+        prices = align_prices(history["close"], dates)
+        result = simulate_trades(
+            decisions["action"].to_numpy(),
+            decisions["quantity"].to_numpy(),
+            prices,
+            self.initial_capital,
+        )
+        self.portfolio = {
+            "cash": float(result.cash[-1]),
+            "stock": float(result.stock[-1]),
+            "portfolio_value": float(result.equity[-1]),
+        }
+        traded_value = np.where(result.stale, 0.0, result.executed * prices)
+        self.portfolio_values = [
+            {"Date": date, "Portfolio Value": value, "Cash": cash, "Traded Value": traded}
+            for date, value, cash, traded in zip(dates, result.equity, result.cash, traded_value)
+        ]
+        return result
+
+    def performance_df(self):
         # Convert portfolio values to DataFrame
-        performance_df = pd.DataFrame(self.portfolio_values).set_index("Date")
+        return pd.DataFrame(self.portfolio_values).set_index("Date")
+
+    def analyze_performance(self, plot_path=None):
+        return report_performance(self.performance_df(), self.initial_capital, plot_path=plot_path)
+
+
+class PortfolioBacktester:
+    """Backtest the whole fund at once: one cash pool, one position per ticker.
+
+    Closes for every ticker are loaded into a single date x ticker matrix.
+    Each trading day, the agent decides every ticker that has a bar from the
+    same start-of-day portfolio (its cash and that ticker's position), then
+    the day's trades are executed together by execute_portfolio_day. Cash,
+    positions and equity are written into arrays preallocated for the whole
+    run.
+    """
+
+    def __init__(self, agent, tickers, start_date, end_date, initial_capital, max_workers=4):
+        self.agent = agent
+        self.tickers = list(tickers)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers
+        self.dates = None
+        self.prices = None
+        self.cash = None
+        self.positions = None
+        self.equity = None
+        self.traded_value = None
+        self.actions = None
+        self.quantities = None
+
+    def load_prices(self):
+        """Load the date x ticker close matrix, with enough history for the agents' lookback."""
+        history_start = (pd.Timestamp(self.start_date) - timedelta(days=30)).strftime("%Y-%m-%d")
+        matrix = get_price_matrix(self.tickers, history_start, self.end_date)
+        matrix = matrix.loc[pd.Timestamp(self.start_date):]
+        self.dates = matrix.index
+        self.prices = matrix.to_numpy()
+
+    def run_backtest(self):
+        self.load_prices()
+        days, tickers = self.prices.shape
+        self.cash = np.empty(days)
+        self.positions = np.empty((days, tickers))
+        self.equity = np.empty(days)
+        self.traded_value = np.empty(days)
+        self.actions = np.zeros((days, tickers), dtype=np.int8)
+        self.quantities = np.zeros((days, tickers))
+        cash = float(self.initial_capital)
+        positions = np.zeros(tickers)
+        # Last known close per ticker, for valuing positions on days without a bar
+        marks = np.full(tickers, np.nan)
+
+        print("\nStarting portfolio backtest...")
+        print(f"{'Date':<12} {'Buys':>5} {'Sells':>6} {'Cash':>14} {'Total Value':>14}")
+        print("-" * 55)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for t, current_date in enumerate(self.dates):
+                current_date_str = current_date.strftime("%Y-%m-%d")
+                lookback_start = (current_date - timedelta(days=30)).strftime("%Y-%m-%d")
+                tradable = np.flatnonzero(~np.isnan(self.prices[t]))
 
-        # Calculate total return
-        total_return = (
-                           self.portfolio["portfolio_value"] - self.initial_capital
-                       ) / self.initial_capital
-        print(f"Total Return: {total_return * 100:.2f}%")
+                def decide(j):
+                    return self.agent(
+                        ticker=self.tickers[j],
+                        start_date=lookback_start,
+                        end_date=current_date_str,
+                        portfolio={"cash": cash, "stock": int(positions[j])},
+                    )
 
-        # Plot the portfolio value over time
-        performance_df["Portfolio Value"].plot(
-            title="Portfolio Value Over Time", figsize=(12, 6)
+                for j, agent_output in zip(tradable, executor.map(decide, tradable)):
+                    action, quantity = Backtester.parse_action(agent_output)
+                    self.actions[t, j] = ACTION_CODES[action]
+                    self.quantities[t, j] = quantity
+
+                cash, positions, executed = execute_portfolio_day(
+                    self.actions[t], self.quantities[t], self.prices[t], cash, positions
+                )
+                marks = np.where(np.isnan(self.prices[t]), marks, self.prices[t])
+                self.cash[t] = cash
+                self.positions[t] = positions
+                self.equity[t] = cash + np.where(positions != 0, positions * marks, 0.0).sum()
+                self.traded_value[t] = np.where(executed > 0, executed * self.prices[t], 0.0).sum()
+
+                traded = executed > 0
+                print(
+                    f"{current_date_str:<12} {np.sum(traded & (self.actions[t] == BUY)):>5} "
+                    f"{np.sum(traded & (self.actions[t] == SELL)):>6} {cash:>14.2f} {self.equity[t]:>14.2f}"
+                )
+
+    def simulate(self, actions, quantities):
+        """Replay date x ticker decision matrices aligned to self.dates, without the agent."""
+        if self.prices is None:
+            self.load_prices()
+        result = simulate_portfolio(actions, quantities, self.prices, self.initial_capital)
+        self.cash, self.positions, self.equity = result.cash, result.positions, result.equity
+        self.traded_value = np.where(result.executed > 0, result.executed * self.prices, 0.0).sum(axis=1)
+        return result
+
+    def positions_df(self) -> pd.DataFrame:
+        """Shares held per ticker at the end of each day."""
+        return pd.DataFrame(self.positions, index=self.dates, columns=self.tickers)
+
+    def performance_df(self):
+        return pd.DataFrame(
+            {"Portfolio Value": self.equity, "Cash": self.cash, "Traded Value": self.traded_value},
+            index=self.dates,
         )
-        plt.ylabel("Portfolio Value ($)")
-        plt.xlabel("Date")
-        plt.show()
-
-        # Compute daily returns
-        performance_df["Daily Return"] = performance_df["Portfolio Value"].pct_change()
-
-        # Calculate Sharpe Ratio (assuming 252 trading days in a year)
-        mean_daily_return = performance_df["Daily Return"].mean()
-        std_daily_return = performance_df["Daily Return"].std()
-        sharpe_ratio = (mean_daily_return / std_daily_return) * (252 ** 0.5)
-        print(f"Sharpe Ratio: {sharpe_ratio:.2f}")
-
-        # Calculate Maximum Drawdown
-        rolling_max = performance_df["Portfolio Value"].cummax()
-        drawdown = performance_df["Portfolio Value"] / rolling_max - 1
-        max_drawdown = drawdown.min()
-        print(f"Maximum Drawdown: {max_drawdown * 100:.2f}%")
-
-        return performance_df
-    
+
+    def analyze_performance(self, plot_path=None):
+        return report_performance(self.performance_df(), self.initial_capital, plot_path=plot_path)
+
+
+def performance_metrics(performance_df, initial_capital):
+    """metrics.performance_metrics of a backtest's performance_df.
+
+    Exposure, hit rate and turnover are included when the frame has "Cash"
+    and "Traded Value" columns.
+    """
+    return metrics.performance_metrics(
+        performance_df["Portfolio Value"].to_numpy(),
+        initial_capital,
+        cash=performance_df["Cash"].to_numpy() if "Cash" in performance_df else None,
+        traded_value=performance_df["Traded Value"].to_numpy() if "Traded Value" in performance_df else None,
+    )
+
+
+def report_performance(performance_df, initial_capital, plot_path=None):
+    """Print the performance_metrics of a "Portfolio Value" series and optionally chart it to a file.
+
+    Adds "Daily Return", "Drawdown" and "Rolling Sharpe" columns to performance_df.
+    """
+    results = performance_metrics(performance_df, initial_capital)
+    rolling = metrics.rolling_metrics(performance_df["Portfolio Value"].to_numpy())
+    performance_df["Daily Return"] = performance_df["Portfolio Value"].pct_change()
+    performance_df["Drawdown"] = rolling["drawdown"]
+    performance_df["Rolling Sharpe"] = rolling["rolling_sharpe"]
+
+    print(f"Total Return: {results['total_return'] * 100:.2f}%")
+    print(f"Annual Return: {results['annual_return'] * 100:.2f}%")
+    print(f"Annual Volatility: {results['annual_volatility'] * 100:.2f}%")
+    print(f"Sharpe Ratio: {results['sharpe_ratio']:.2f}")
+    print(f"Sortino Ratio: {results['sortino_ratio']:.2f}")
+    print(f"Calmar Ratio: {results['calmar_ratio']:.2f}")
+    print(f"Maximum Drawdown: {results['max_drawdown'] * 100:.2f}%")
+    print(f"Longest Drawdown: {results['max_drawdown_duration']:.0f} days")
+    if "exposure" in results:
+        print(f"Exposure: {results['exposure'] * 100:.2f}%")
+        print(f"Hit Rate: {results['hit_rate'] * 100:.2f}%")
+    if "turnover" in results:
+        print(f"Turnover: {results['turnover']:.2f}x per year")
+
+    if plot_path:
+        metrics.plot_performance(performance_df, plot_path)
+        print(f"Saved performance chart to {plot_path}")
+
+    return performance_df
+
 ### 4. Run the Backtest #####
 if __name__ == "__main__":
     import argparse
@@ -133,21 +356,42 @@ if __name__ == "__main__":
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Run backtesting simulation')
     parser.add_argument('--ticker', type=str, help='Stock ticker symbol (e.g., AAPL)')
+    parser.add_argument('--tickers', type=str, nargs='+', help='Backtest these tickers as one portfolio with shared cash')
+    parser.add_argument('--fund', type=str, help='Backtest every holding of a fund file (e.g., fund.json) as one portfolio')
     parser.add_argument('--end_date', type=str, default=datetime.now().strftime('%Y-%m-%d'), help='End date in YYYY-MM-DD format')
     parser.add_argument('--start_date', type=str, default=(datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d'), help='Start date in YYYY-MM-DD format')
     parser.add_argument('--initial_capital', type=float, default=100000, help='Initial capital amount (default: 100000)')
+    parser.add_argument('--streaming', action='store_true', help='Update technical indicators incrementally instead of recomputing them each day')
+    parser.add_argument('--rule_based', action='store_true', help='Use the deterministic rule-based portfolio manager instead of the LLM')
+    parser.add_argument('--plot', type=str, help='Save a chart of the portfolio value, drawdown and rolling Sharpe ratio to this file (e.g., backtest.png)')
 
     args = parser.parse_args()
 
+    tickers = args.tickers
+    if args.fund:
+        import json
+        with open(args.fund) as f:
+            tickers = [ticker for category in json.load(f)['holdings'].values() for ticker in category['holdings']]
+
     # Create an instance of Backtester
-    backtester = Backtester(
-        agent=run_hedge_fund,
-        ticker=args.ticker,
-        start_date=args.start_date,
-        end_date=args.end_date,
-        initial_capital=args.initial_capital,
-    )
+    if tickers:
+        backtester = PortfolioBacktester(
+            agent=partial(run_hedge_fund, rule_based=args.rule_based),
+            tickers=tickers,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            initial_capital=args.initial_capital,
+        )
+    else:
+        backtester = Backtester(
+            agent=partial(run_hedge_fund, rule_based=args.rule_based),
+            ticker=args.ticker,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            initial_capital=args.initial_capital,
+            streaming=args.streaming,
+        )
 
     # Run the backtesting process
     backtester.run_backtest()
-    performance_df = backtester.analyze_performance()
+    performance_df = backtester.analyze_performance(plot_path=args.plot)
@@ -0,0 +1,189 @@
+import argparse
+import time
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from agents.technicals import (
+    STRATEGY_WEIGHTS,
+    IndicatorContext,
+    calculate_mean_reversion_signals,
+    calculate_momentum_signals,
+    calculate_hurst_exponent,
+    calculate_obv,
+    calculate_rolling_hurst_exponent,
+    calculate_stat_arb_signals,
+    calculate_technical_signal_series,
+    calculate_trend_signals,
+    calculate_volatility_signals,
+    weighted_signal_combination,
+)
+from backtester import Backtester
+from simulation import simulate_trades
+
+
+def make_prices_df(num_bars: int, seed: int = 0) -> pd.DataFrame:
+    """Build a synthetic daily OHLCV DataFrame shaped like prices_to_df output."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, num_bars)))
+    # Round so that unchanged closes (the flat OBV case) also occur
+    close = np.round(close, 1)
+    high = close * (1 + rng.uniform(0, 0.02, num_bars))
+    low = close * (1 - rng.uniform(0, 0.02, num_bars))
+    open_ = low + (high - low) * rng.uniform(0, 1, num_bars)
+    volume = rng.integers(1_000, 1_000_000, num_bars)
+    # Daily rather than business-day spacing keeps 100k bars inside the datetime64[ns] range
+    index = pd.date_range("1750-01-01", periods=num_bars, freq="D", name="Date")
+    return pd.DataFrame(
+        {"open": open_, "close": close, "high": high, "low": low, "volume": volume},
+        index=index,
+    )
+
+
+def _calculate_obv_loop(prices_df: pd.DataFrame) -> pd.Series:
+    """Row-by-row OBV reference implementation that calculate_obv replaced."""
+    obv = [0]
+    for i in range(1, len(prices_df)):
+        if prices_df['close'].iloc[i] > prices_df['close'].iloc[i - 1]:
+            obv.append(obv[-1] + prices_df['volume'].iloc[i])
+        elif prices_df['close'].iloc[i] < prices_df['close'].iloc[i - 1]:
+            obv.append(obv[-1] - prices_df['volume'].iloc[i])
+        else:
+            obv.append(obv[-1])
+    return pd.Series(obv, index=prices_df.index, name='OBV')
+
+
+def _calculate_hurst_exponent_loop(price_series, max_lag: int = 20) -> float:
+    """Per-lag Python loop that calculate_hurst_exponent replaced."""
+    lags = range(2, max_lag)
+    tau = [max(1e-8, np.sqrt(np.std(np.subtract(price_series[lag:], price_series[:-lag])))) for lag in lags]
+    return np.polyfit(np.log(lags), np.log(tau), 1)[0]
+
+
+def _best_time(func: Callable, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_obv(sizes: List[int], repeat: int = 3) -> None:
+    print("\nOn-Balance Volume")
+    print(f"{'Bars':>8} {'Loop (ms)':>12} {'Vectorized (ms)':>16} {'Speedup':>9} {'Identical':>10}")
+    print("-" * 60)
+    for size in sizes:
+        prices_df = make_prices_df(size)
+        columns_before = list(prices_df.columns)
+        reference = _calculate_obv_loop(prices_df)
+        result = calculate_obv(prices_df)
+        identical = reference.equals(result) and list(prices_df.columns) == columns_before
+        loop_time = _best_time(_calculate_obv_loop, prices_df, repeat=1)
+        vectorized_time = _best_time(calculate_obv, prices_df, repeat=repeat)
+        print(
+            f"{size:>8} {loop_time * 1000:>12.2f} {vectorized_time * 1000:>16.3f} "
+            f"{loop_time / vectorized_time:>8.0f}x {str(identical):>10}"
+        )
+
+
+def benchmark_hurst(sizes: List[int], repeat: int = 3, window: int = 126) -> None:
+    """Hurst exponent: old per-lag loop on the close Series vs the one-pass version.
+
+    The old loop subtracted index-aligned Series, so every lag difference was
+    zero; the "Matches" column compares against the loop run on the raw values.
+    """
+    print("\nHurst exponent")
+    print(f"{'Bars':>8} {'Loop (ms)':>12} {'One pass (ms)':>14} {'Speedup':>9} {'Matches':>8} {'Rolling series (ms)':>20}")
+    print("-" * 78)
+    for size in sizes:
+        close = make_prices_df(size)['close']
+        loop_time = _best_time(_calculate_hurst_exponent_loop, close, repeat=repeat)
+        fast_time = _best_time(calculate_hurst_exponent, close, repeat=repeat)
+        matches = np.isclose(
+            calculate_hurst_exponent(close), _calculate_hurst_exponent_loop(close.to_numpy()), rtol=1e-6
+        )
+        rolling_time = _best_time(calculate_rolling_hurst_exponent, close.to_numpy(), window, repeat=repeat)
+        print(
+            f"{size:>8} {loop_time * 1000:>12.2f} {fast_time * 1000:>14.3f} "
+            f"{loop_time / fast_time:>8.0f}x {str(matches):>8} {rolling_time * 1000:>20.2f}"
+        )
+
+
+def _technical_signal_at(prices_df: pd.DataFrame) -> dict:
+    """Combined technical signal for the last bar, as the analyst agent computes it."""
+    indicators = IndicatorContext(prices_df)
+    return weighted_signal_combination({
+        'trend': calculate_trend_signals(prices_df, indicators),
+        'mean_reversion': calculate_mean_reversion_signals(prices_df, indicators),
+        'momentum': calculate_momentum_signals(prices_df, indicators),
+        'volatility': calculate_volatility_signals(prices_df, indicators),
+        'stat_arb': calculate_stat_arb_signals(prices_df, indicators),
+    }, STRATEGY_WEIGHTS)
+
+
+def benchmark_signal_series(sizes: List[int], repeat: int = 3, sample: int = 20) -> None:
+    """Series mode against one technical analysis per bar.
+
+    The per-bar cost is measured on the last ``sample`` bars and scaled to the
+    full history, since running it for every bar of a long history takes minutes.
+    """
+    print("\nTechnical signals over a whole history")
+    print(f"{'Bars':>8} {'Per bar (ms, est.)':>19} {'Series (ms)':>12} {'Speedup':>9}")
+    print("-" * 52)
+    for size in sizes:
+        prices_df = make_prices_df(size)
+        start = time.perf_counter()
+        for end in range(size - min(sample, size) + 1, size + 1):
+            _technical_signal_at(prices_df.iloc[:end])
+        per_bar_time = (time.perf_counter() - start) / min(sample, size) * size
+        series_time = _best_time(calculate_technical_signal_series, prices_df, repeat=repeat)
+        print(
+            f"{size:>8} {per_bar_time * 1000:>19.0f} {series_time * 1000:>12.2f} "
+            f"{per_bar_time / series_time:>8.0f}x"
+        )
+
+
+def _simulate_trades_loop(actions, quantities, prices, initial_capital: float) -> np.ndarray:
+    """Per-day execute_trade loop, as the backtester runs it, for one configuration."""
+    backtester = Backtester(None, None, None, None, initial_capital)
+    equity = np.empty(len(prices))
+    for t, (action, quantity, price) in enumerate(zip(actions, quantities, prices)):
+        backtester.execute_trade(action, quantity, price)
+        equity[t] = backtester.portfolio["cash"] + backtester.portfolio["stock"] * price
+    return equity
+
+
+def benchmark_simulation(sizes: List[int], configs: int = 1_000, repeat: int = 3) -> None:
+    """Portfolio simulation of many decision series: per-day loop vs simulate_trades."""
+    print(f"\nPortfolio simulation ({configs} configurations)")
+    print(f"{'Days':>8} {'Loop (ms, est.)':>16} {'Vectorized (ms)':>16} {'Speedup':>9} {'Identical':>10}")
+    print("-" * 64)
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        prices = make_prices_df(size)['close'].to_numpy()
+        actions = rng.choice(np.array(["buy", "sell", "hold"]), (size, configs))
+        quantities = rng.integers(0, 500, (size, configs))
+        start = time.perf_counter()
+        reference = _simulate_trades_loop(actions[:, 0], quantities[:, 0], prices, 100_000)
+        loop_time = (time.perf_counter() - start) * configs
+        result = simulate_trades(actions, quantities, prices, 100_000)
+        identical = np.array_equal(reference, result.equity[:, 0])
+        vectorized_time = _best_time(simulate_trades, actions, quantities, prices, 100_000, repeat=repeat)
+        print(
+            f"{size:>8} {loop_time * 1000:>16.0f} {vectorized_time * 1000:>16.2f} "
+            f"{loop_time / vectorized_time:>8.0f}x {str(identical):>10}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark technical indicator implementations')
+    parser.add_argument('--bars', type=int, nargs='+', default=[1_000, 10_000, 100_000], help='History lengths to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions for the fast implementations')
+    args = parser.parse_args()
+
+    benchmark_obv(args.bars, repeat=args.repeat)
+    benchmark_hurst(args.bars, repeat=args.repeat)
+    benchmark_signal_series(args.bars, repeat=args.repeat)
+    benchmark_simulation([252, 2_520], repeat=args.repeat)
@@ -3,7 +3,7 @@ from langgraph.graph import END, StateGraph
 
 from agents.fundamentals import fundamentals_agent
 from agents.market_data import market_data_agent
-from agents.portfolio_manager import portfolio_management_agent
+from agents.portfolio_manager import PortfolioDecision, portfolio_management_agent, rule_based_portfolio_management_agent
 from agents.technicals import technical_analyst_agent
 from agents.risk_manager import risk_management_agent
 from agents.sentiment import sentiment_agent
@@ -13,55 +13,136 @@ from agents.valuation import valuation_agent
 import argparse
 from datetime import datetime
 
+# Portfolio used when analysing a ticker without an existing position
+DEFAULT_PORTFOLIO = {
+    "cash": 100000.0,  # $100,000 initial cash
+    "stock": 0         # No initial stock position
+}
+
 
 ##### Run the Hedge Fund #####
-def run_hedge_fund(ticker: str, start_date: str, end_date: str, portfolio: dict, show_reasoning: bool = False):
-    final_state = app.invoke(
+def run_hedge_fund(ticker: str, start_date: str, end_date: str, portfolio: dict, show_reasoning: bool = False, market_data: dict = None, show_indicator_cache: bool = False, indicator_snapshot: dict = None, rule_based: bool = False, parameters: dict = None, deadline: float = None):
+    """Run the agent graph for one ticker.
+
+    ``market_data`` is an optional bundle prefetched with
+    ``tools.api.get_universe_market_data``; when given, the market data agent
+    uses it instead of calling the API. ``show_indicator_cache`` prints how
+    many technical indicators were computed versus reused from the cache.
+    ``indicator_snapshot`` is the latest state of a
+    ``TechnicalIndicatorStream``; when given, the technical analyst uses it
+    instead of recomputing indicators from the price history.
+    ``rule_based`` replaces the LLM portfolio manager with its deterministic
+    rule-based counterpart. ``parameters`` overrides the agents' tunable
+    parameters, keyed by agent name (see ``agents.state.agent_parameters``).
+    ``deadline`` is a ``time.monotonic()`` value that bounds the market data
+    requests and the LLM call (see ``agents.state.time_budget``).
+    """
+    graph = rule_based_app if rule_based else app
+    final_state = graph.invoke(
         {
             "messages": [
                 HumanMessage(
                     content="Make a trading decision based on the provided data.",
                 )
             ],
+            "signals": {},
             "data": {
                 "ticker": ticker,
                 "portfolio": portfolio,
                 "start_date": start_date,
                 "end_date": end_date,
+                "market_data": market_data,
+                "indicator_snapshot": indicator_snapshot,
             },
             "metadata": {
                 "show_reasoning": show_reasoning,
+                "show_indicator_cache": show_indicator_cache,
+                "parameters": parameters or {},
+                "deadline": deadline,
             }
         },
     )
     return final_state["messages"][-1].content
 
-# Define the new workflow
-workflow = StateGraph(AgentState)
+def analyze_ticker(ticker: str, start_date: str = None, end_date: str = None, portfolio: dict = None, show_reasoning: bool = False, market_data: dict = None, rule_based: bool = False, deadline: float = None) -> dict:
+    """Run the hedge fund for one ticker and return the trading decision as a dict."""
+    result = run_hedge_fund(
+        ticker=ticker,
+        start_date=start_date,
+        end_date=end_date,
+        portfolio=dict(portfolio or DEFAULT_PORTFOLIO),
+        show_reasoning=show_reasoning,
+        market_data=market_data,
+        rule_based=rule_based,
+        deadline=deadline,
+    )
+    return PortfolioDecision.model_validate_json(result).model_dump()
+
+def collect_signals(ticker: str, start_date: str = None, end_date: str = None, portfolio: dict = None, market_data: dict = None, deadline: float = None) -> dict:
+    """Run every agent except the portfolio manager and return their signals.
+
+    The result maps agent name to its AgentSignal / RiskAssessment and can be
+    handed to ``agents.portfolio_manager.batch_portfolio_decisions``.
+    """
+    final_state = signals_app.invoke(
+        {
+            "messages": [],
+            "signals": {},
+            "data": {
+                "ticker": ticker,
+                "portfolio": dict(portfolio or DEFAULT_PORTFOLIO),
+                "start_date": start_date,
+                "end_date": end_date,
+                "market_data": market_data,
+            },
+            "metadata": {
+                "show_reasoning": False,
+                "deadline": deadline,
+            }
+        },
+    )
+    return final_state["signals"]
+
+def create_workflow(portfolio_agent=portfolio_management_agent) -> StateGraph:
+    """Build the agent graph with the given portfolio manager node.
+
+    With ``portfolio_agent=None`` the graph ends after the risk manager,
+    leaving the decision to a batched, portfolio-level call.
+    """
+    workflow = StateGraph(AgentState)
 
-# Add nodes
-workflow.add_node("market_data_agent", market_data_agent)
-workflow.add_node("technical_analyst_agent", technical_analyst_agent)
-workflow.add_node("fundamentals_agent", fundamentals_agent)
-workflow.add_node("sentiment_agent", sentiment_agent)
-workflow.add_node("risk_management_agent", risk_management_agent)
-workflow.add_node("portfolio_management_agent", portfolio_management_agent)
-workflow.add_node("valuation_agent", valuation_agent)
+    # Add nodes
+    workflow.add_node("market_data_agent", market_data_agent)
+    workflow.add_node("technical_analyst_agent", technical_analyst_agent)
+    workflow.add_node("fundamentals_agent", fundamentals_agent)
+    workflow.add_node("sentiment_agent", sentiment_agent)
+    workflow.add_node("risk_management_agent", risk_management_agent)
+    if portfolio_agent is not None:
+        workflow.add_node("portfolio_management_agent", portfolio_agent)
+    workflow.add_node("valuation_agent", valuation_agent)
 
-# Define the workflow
-workflow.set_entry_point("market_data_agent")
-workflow.add_edge("market_data_agent", "technical_analyst_agent")
-workflow.add_edge("market_data_agent", "fundamentals_agent")
-workflow.add_edge("market_data_agent", "sentiment_agent")
-workflow.add_edge("market_data_agent", "valuation_agent")
-workflow.add_edge("technical_analyst_agent", "risk_management_agent")
-workflow.add_edge("fundamentals_agent", "risk_management_agent")
-workflow.add_edge("sentiment_agent", "risk_management_agent")
-workflow.add_edge("valuation_agent", "risk_management_agent")
-workflow.add_edge("risk_management_agent", "portfolio_management_agent")
-workflow.add_edge("portfolio_management_agent", END)
+    # Define the workflow
+    workflow.set_entry_point("market_data_agent")
+    workflow.add_edge("market_data_agent", "technical_analyst_agent")
+    workflow.add_edge("market_data_agent", "fundamentals_agent")
+    workflow.add_edge("market_data_agent", "sentiment_agent")
+    workflow.add_edge("market_data_agent", "valuation_agent")
+    workflow.add_edge("technical_analyst_agent", "risk_management_agent")
+    workflow.add_edge("fundamentals_agent", "risk_management_agent")
+    workflow.add_edge("sentiment_agent", "risk_management_agent")
+    workflow.add_edge("valuation_agent", "risk_management_agent")
+    if portfolio_agent is None:
+        workflow.add_edge("risk_management_agent", END)
+    else:
+        workflow.add_edge("risk_management_agent", "portfolio_management_agent")
+        workflow.add_edge("portfolio_management_agent", END)
+    return workflow
 
+# One compiled graph per portfolio manager mode
+workflow = create_workflow()
 app = workflow.compile()
+rule_based_app = create_workflow(rule_based_portfolio_management_agent).compile()
+signals_app = create_workflow(None).compile()
 
 # Add this at the bottom of the file
 if __name__ == "__main__":
@@ -70,6 +151,8 @@ if __name__ == "__main__":
     parser.add_argument('--start-date', type=str, help='Start date (YYYY-MM-DD). Defaults to 3 months before end date')
     parser.add_argument('--end-date', type=str, help='End date (YYYY-MM-DD). Defaults to today')
     parser.add_argument('--show-reasoning', action='store_true', help='Show reasoning from each agent')
+    parser.add_argument('--show-indicator-cache', action='store_true', help='Show technical indicator cache hits and misses')
+    parser.add_argument('--rule-based', action='store_true', help='Use the deterministic rule-based portfolio manager instead of the LLM')
     
     args = parser.parse_args()
     
@@ -87,17 +170,16 @@ if __name__ == "__main__":
             raise ValueError("End date must be in YYYY-MM-DD format")
     
     # Sample portfolio - you might want to make this configurable too
-    portfolio = {
-        "cash": 100000.0,  # $100,000 initial cash
-        "stock": 0         # No initial stock position
-    }
+    portfolio = dict(DEFAULT_PORTFOLIO)
     
     result = run_hedge_fund(
         ticker=args.ticker,
         start_date=args.start_date,
         end_date=args.end_date,
         portfolio=portfolio,
-        show_reasoning=args.show_reasoning
+        show_reasoning=args.show_reasoning,
+        show_indicator_cache=args.show_indicator_cache,
+        rule_based=args.rule_based
     )
     print("\nFinal Result:")
     print(result)
\ No newline at end of file
@@ -0,0 +1,156 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+# Trading days in the rolling window, about one quarter
+ROLLING_WINDOW = 63
+
+
+def _scalars(metrics: Dict[str, np.ndarray]) -> Dict[str, object]:
+    """Unwrap 0-d results to floats so a single equity curve gives plain numbers."""
+    return {name: float(value) if np.ndim(value) == 0 else value for name, value in metrics.items()}
+
+
+def drawdown_series(equity) -> np.ndarray:
+    """Fractional distance of each day's equity below its running peak (0 at a peak)."""
+    equity = np.asarray(equity, dtype=float)
+    return equity / np.maximum.accumulate(equity, axis=0) - 1
+
+
+def performance_metrics(
+    equity,
+    initial_capital: float,
+    cash=None,
+    traded_value=None,
+    periods_per_year: int = TRADING_DAYS,
+) -> Dict[str, object]:
+    """Risk and return statistics of equity curves, computed in one pass with NumPy.
+
+    Time runs along axis 0: pass shape (days,) for one backtest or
+    (days, configs) to score many simulate_trades results at once, in
+    which case every metric is an array with one value per configuration.
+    Ratios that are undefined (e.g. the Sharpe ratio of a flat curve) are NaN.
+
+    Args:
+        equity: Portfolio value at the end of each day
+        initial_capital: Starting cash, the base of the total return
+        cash: Cash at the end of each day; adds exposure and hit_rate
+        traded_value: Notional traded each day (shares times price); adds turnover
+        periods_per_year: Bars per year, for annualizing
+
+    Returns:
+        total_return, annual_return, annual_volatility, sharpe_ratio,
+        sortino_ratio, max_drawdown, calmar_ratio and max_drawdown_duration
+        (longest time below a previous peak, in bars), plus exposure (mean
+        fraction of equity held in positions), hit_rate (share of invested
+        days with a positive return) and turnover (annualized notional
+        traded over mean equity) when their inputs are given
+    """
+    equity = np.asarray(equity, dtype=float)
+    days = equity.shape[0]
+    steps = np.arange(days).reshape((days,) + (1,) * (equity.ndim - 1))
+    annualize = np.sqrt(periods_per_year)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[1:] / equity[:-1] - 1
+        count = returns.shape[0]
+        mean = returns.sum(axis=0) / count
+        std = np.sqrt(((returns - mean) ** 2).sum(axis=0) / max(count - 1, 0))
+        downside = np.sqrt((np.minimum(returns, 0) ** 2).sum(axis=0) / count)
+
+        peaks = np.maximum.accumulate(equity, axis=0)
+        max_drawdown = (equity / peaks - 1).min(axis=0)
+        # Bars since the most recent peak; its maximum is the longest drawdown
+        last_peak = np.maximum.accumulate(np.where(equity >= peaks, steps, 0), axis=0)
+
+        growth = equity[-1] / initial_capital
+        annual_return = growth ** (periods_per_year / days) - 1
+        metrics = {
+            "total_return": growth - 1,
+            "annual_return": annual_return,
+            "annual_volatility": std * annualize,
+            "sharpe_ratio": mean / std * annualize,
+            "sortino_ratio": mean / downside * annualize,
+            "max_drawdown": max_drawdown,
+            "calmar_ratio": np.where(max_drawdown < 0, annual_return / -max_drawdown, np.nan),
+            "max_drawdown_duration": (steps - last_peak).max(axis=0),
+        }
+
+        if cash is not None:
+            exposure = 1 - np.asarray(cash, dtype=float) / equity
+            # A day's return is earned on the position held since the previous close
+            invested = exposure[:-1] > 0
+            metrics["exposure"] = exposure.mean(axis=0)
+            metrics["hit_rate"] = (invested & (returns > 0)).sum(axis=0) / invested.sum(axis=0)
+
+        if traded_value is not None:
+            traded = np.asarray(traded_value, dtype=float).sum(axis=0)
+            metrics["turnover"] = traded / equity.mean(axis=0) * periods_per_year / days
+
+    return _scalars(metrics)
+
+
+def rolling_metrics(
+    equity,
+    window: int = ROLLING_WINDOW,
+    periods_per_year: int = TRADING_DAYS,
+) -> Dict[str, np.ndarray]:
+    """Trailing-window return, volatility and Sharpe ratio, plus the drawdown, per day.
+
+    Window sums come from cumulative sums of the daily returns, so the cost
+    does not grow with the window. Every array is aligned with ``equity``
+    (days along axis 0) and is NaN until ``window`` returns are available.
+    """
+    equity = np.asarray(equity, dtype=float)
+    padding = np.full((min(window, len(equity)),) + equity.shape[1:], np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[1:] / equity[:-1] - 1
+        zeros = np.zeros((1,) + equity.shape[1:])
+        sums = np.concatenate([zeros, np.cumsum(returns, axis=0)])
+        squares = np.concatenate([zeros, np.cumsum(returns ** 2, axis=0)])
+        window_sum = sums[window:] - sums[:-window]
+        window_squares = squares[window:] - squares[:-window]
+        mean = window_sum / window
+        # Rounding in the differenced sums can leave a tiny negative variance
+        variance = np.maximum(window_squares - window_sum * mean, 0) / (window - 1)
+        std = np.sqrt(variance)
+
+        return {
+            "drawdown": drawdown_series(equity),
+            "rolling_return": np.concatenate([padding, equity[window:] / equity[:-window] - 1]),
+            "rolling_volatility": np.concatenate([padding, std * np.sqrt(periods_per_year)]),
+            "rolling_sharpe": np.concatenate([padding, mean / std * np.sqrt(periods_per_year)]),
+        }
+
+
+def plot_performance(performance_df: pd.DataFrame, path: str, window: int = ROLLING_WINDOW) -> str:
+    """Save the equity curve, drawdown and rolling Sharpe ratio of a "Portfolio Value" series to ``path``.
+
+    Renders with the Agg canvas directly, so no display or pyplot is needed;
+    matplotlib is imported only when a chart is requested.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    equity = performance_df["Portfolio Value"]
+    rolling = rolling_metrics(equity.to_numpy(), window=window)
+
+    figure = Figure(figsize=(12, 9))
+    FigureCanvasAgg(figure)
+    value_axes, drawdown_axes, sharpe_axes = figure.subplots(
+        3, 1, sharex=True, gridspec_kw={"height_ratios": [3, 1, 1]}
+    )
+    value_axes.plot(equity.index, equity.to_numpy())
+    value_axes.set_title("Portfolio Value Over Time")
+    value_axes.set_ylabel("Portfolio Value ($)")
+    drawdown_axes.fill_between(equity.index, rolling["drawdown"] * 100, 0, color="tab:red", alpha=0.4)
+    drawdown_axes.set_ylabel("Drawdown (%)")
+    sharpe_axes.plot(equity.index, rolling["rolling_sharpe"], color="tab:green")
+    sharpe_axes.set_ylabel(f"{window}-day Sharpe")
+    sharpe_axes.set_xlabel("Date")
+    figure.tight_layout()
+    figure.savefig(path)
+    return path
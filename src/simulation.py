@@ -0,0 +1,204 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+HOLD, BUY, SELL = 0, 1, -1
+ACTION_CODES = {"hold": HOLD, "buy": BUY, "sell": SELL}
+
+
+def encode_actions(actions) -> np.ndarray:
+    """Map "buy" / "sell" / "hold" (or their integer codes) to int8 action codes."""
+    actions = np.asarray(actions)
+    if actions.dtype.kind in "iub":
+        return actions.astype(np.int8)
+    codes = np.full(actions.shape, HOLD, dtype=np.int8)
+    codes[actions == "buy"] = BUY
+    codes[actions == "sell"] = SELL
+    return codes
+
+
+def align_prices(closes: pd.Series, dates) -> np.ndarray:
+    """Closing price on each of ``dates``, NaN where there is no bar that day.
+
+    Bars are matched on the calendar day, so a holiday or any other missing
+    bar shows up as NaN instead of silently repeating the previous close.
+    """
+    by_day = pd.Series(closes.to_numpy(dtype=float), index=closes.index.strftime("%Y-%m-%d"))
+    by_day = by_day[~by_day.index.duplicated(keep="last")]
+    return by_day.reindex(pd.DatetimeIndex(dates).strftime("%Y-%m-%d")).to_numpy()
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Per-day state after each day's trade; arrays share the decisions' shape."""
+    cash: np.ndarray
+    stock: np.ndarray
+    equity: np.ndarray
+    executed: np.ndarray  # Shares actually traded, after clipping
+    stale: np.ndarray     # Days without a price bar: no trade, equity marked at the last close
+
+    def to_df(self, dates) -> pd.DataFrame:
+        """Single-configuration result as a DataFrame indexed by date."""
+        return pd.DataFrame(
+            {
+                "Cash": self.cash,
+                "Stock": self.stock,
+                "Executed": self.executed,
+                "Portfolio Value": self.equity,
+                "Stale": self.stale,
+            },
+            index=pd.DatetimeIndex(dates, name="Date"),
+        )
+
+
+def simulate_trades(actions, quantities, prices, initial_capital: float, initial_stock: float = 0) -> SimulationResult:
+    """Cash, position and equity curves for a precomputed decision series.
+
+    Applies Backtester.execute_trade's rules: a buy that costs more than the
+    cash on hand is cut to the largest affordable whole number of shares,
+    and a sell is capped at the shares held. Those caps make each day depend
+    on the previous day's cash and position, so time is walked once, but
+    every step is vectorized across configurations: pass decisions of shape
+    (days, configs) to simulate thousands of parameter sets in one call.
+
+    Days whose price is NaN (see align_prices) execute no trade and mark the
+    position at the last known close.
+
+    Args:
+        actions: "buy" / "sell" / "hold" or BUY / SELL / HOLD codes, shape (days,) or (days, configs)
+        quantities: Requested shares per day, broadcastable to actions
+        prices: Close per day, shape (days,) or broadcastable to actions
+        initial_capital: Starting cash
+        initial_stock: Starting shares
+
+    Returns:
+        SimulationResult with arrays shaped like the broadcast decisions
+    """
+    actions = encode_actions(actions)
+    quantities = np.asarray(quantities, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    ndim = max(actions.ndim, quantities.ndim, prices.ndim)
+    prices = prices.reshape(prices.shape + (1,) * (ndim - prices.ndim))
+    actions, quantities, prices = np.broadcast_arrays(actions, quantities, prices)
+    shape = actions.shape
+
+    stale = np.isnan(prices)
+    # Last known close per day, for marking positions on days without a bar
+    marks = pd.DataFrame(prices.reshape(shape[0], -1)).ffill().to_numpy().reshape(shape)
+    wants_buy = (actions == BUY) & (quantities > 0) & ~stale
+    wants_sell = (actions == SELL) & (quantities > 0) & ~stale
+
+    cash = np.empty(shape)
+    stock = np.empty(shape)
+    executed = np.zeros(shape)
+    cash_t = np.full(shape[1:], float(initial_capital))
+    stock_t = np.full(shape[1:], float(initial_stock))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for t in range(shape[0]):
+            price = prices[t]
+            requested = quantities[t]
+            bought = np.where(wants_buy[t], requested, 0.0)
+            # Floor division is slow, so it only runs for buys that need cutting
+            over_budget = bought * price > cash_t
+            if over_budget.any():
+                bought[over_budget] = cash_t[over_budget] // price[over_budget]
+            sold = np.where(wants_sell[t], np.minimum(requested, stock_t), 0.0)
+            if bought.any():
+                stock_t = stock_t + bought
+                cash_t = np.where(bought > 0, cash_t - bought * price, cash_t)
+            if sold.any():
+                stock_t = stock_t - sold
+                cash_t = np.where(sold > 0, cash_t + sold * price, cash_t)
+            cash[t] = cash_t
+            stock[t] = stock_t
+            executed[t] = bought + sold
+
+    equity = cash + np.where(stock != 0, stock * marks, 0.0)
+    return SimulationResult(cash=cash, stock=stock, equity=equity, executed=executed, stale=stale)
+
+
+def execute_portfolio_day(actions, quantities, prices, cash: float, positions: np.ndarray):
+    """Apply one day's decisions for every ticker against a single cash pool.
+
+    Sells are filled first, each capped at the shares held, so their proceeds
+    can fund the day's buys. Buys then fill in ticker order with
+    execute_trade's rule: one that costs more than the remaining cash is cut
+    to the largest affordable whole number of shares. Tickers whose price is
+    NaN (no bar that day) do not trade.
+
+    Returns:
+        (cash, positions, executed) after the day's trades
+    """
+    actions = encode_actions(actions)
+    quantities = np.asarray(quantities, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    tradable = (quantities > 0) & ~np.isnan(prices)
+
+    sold = np.where(tradable & (actions == SELL), np.minimum(quantities, positions), 0.0)
+    positions = positions - sold
+    for j in np.flatnonzero(sold > 0):
+        cash += sold[j] * prices[j]
+
+    bought = np.zeros_like(sold)
+    for j in np.flatnonzero(tradable & (actions == BUY)):
+        quantity = quantities[j] if quantities[j] * prices[j] <= cash else cash // prices[j]
+        if quantity > 0:
+            bought[j] = quantity
+            cash -= quantity * prices[j]
+    positions = positions + bought
+    return cash, positions, bought + sold
+
+
+@dataclass(frozen=True)
+class PortfolioSimulationResult:
+    """Per-day state of a multi-ticker portfolio after each day's trades."""
+    cash: np.ndarray       # (days,)
+    positions: np.ndarray  # (days, tickers)
+    equity: np.ndarray     # (days,)
+    executed: np.ndarray   # (days, tickers) shares actually traded, after clipping
+    stale: np.ndarray      # (days, tickers) no bar that day: no trade, marked at the last close
+
+
+def mark_to_market(cash: np.ndarray, positions: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """Equity per day, valuing each position at its ticker's last known close."""
+    marks = pd.DataFrame(prices).ffill().to_numpy()
+    return cash + np.where(positions != 0, positions * marks, 0.0).sum(axis=1)
+
+
+def simulate_portfolio(actions, quantities, prices, initial_capital: float) -> PortfolioSimulationResult:
+    """Cash, positions and equity of a multi-ticker portfolio for precomputed decisions.
+
+    Args:
+        actions: "buy" / "sell" / "hold" or codes, shape (days, tickers)
+        quantities: Requested shares, shape (days, tickers)
+        prices: Date x ticker close matrix, NaN where a ticker has no bar
+        initial_capital: Starting cash shared by every ticker
+
+    Returns:
+        PortfolioSimulationResult; each day is executed with execute_portfolio_day
+    """
+    actions = encode_actions(actions)
+    quantities = np.asarray(quantities, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    days, tickers = prices.shape
+
+    cash = np.empty(days)
+    positions = np.empty((days, tickers))
+    executed = np.empty((days, tickers))
+    cash_t = float(initial_capital)
+    positions_t = np.zeros(tickers)
+    for t in range(days):
+        cash_t, positions_t, executed[t] = execute_portfolio_day(
+            actions[t], quantities[t], prices[t], cash_t, positions_t
+        )
+        cash[t] = cash_t
+        positions[t] = positions_t
+
+    return PortfolioSimulationResult(
+        cash=cash,
+        positions=positions,
+        equity=mark_to_market(cash, positions, prices),
+        executed=executed,
+        stale=np.isnan(prices),
+    )
@@ -0,0 +1,278 @@
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from multiprocessing import get_context, shared_memory
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester, performance_metrics
+from main import run_hedge_fund
+from tools.api import (
+    MARKET_DATA_LINE_ITEMS,
+    get_financial_metrics,
+    get_insider_trades,
+    get_market_cap,
+    get_prices,
+    search_line_items,
+)
+from tools.price_bars import PriceBars
+
+# Rows of a shared price block; every column is stored as 8-byte words
+SHARED_COLUMNS = ["index", "open", "close", "high", "low", "volume"]
+
+METRIC_COLUMNS = [
+    "total_return",
+    "annual_return",
+    "annual_volatility",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "calmar_ratio",
+    "max_drawdown",
+    "max_drawdown_duration",
+    "exposure",
+    "hit_rate",
+    "turnover",
+    "seconds",
+    "error",
+]
+
+
+def expand_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Dict[str, Any]]]:
+    """Every combination of a parameter grid, as run_hedge_fund ``parameters``.
+
+    Grid keys are "<agent name>.<parameter>", e.g.
+    {"risk_management_agent.reduce_risk_score": [5, 6, 7],
+     "valuation_agent.discount_rate": [0.08, 0.10]} expands to six
+    configurations.
+    """
+    keys = list(grid)
+    configurations = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        parameters = {}
+        for key, value in zip(keys, values):
+            agent, name = key.split(".", 1)
+            parameters.setdefault(agent, {})[name] = value
+        configurations.append(parameters)
+    return configurations
+
+
+def _flatten(parameters: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        f"{agent}.{name}": value
+        for agent, values in parameters.items()
+        for name, value in values.items()
+    }
+
+
+def share_price_bars(bars: PriceBars):
+    """Copy bars into one shared memory block.
+
+    Returns the block, which the caller must close and unlink, and a small
+    picklable spec that attach_price_bars turns back into PriceBars.
+    """
+    length = len(bars)
+    block = shared_memory.SharedMemory(create=True, size=max(len(SHARED_COLUMNS) * length * 8, 1))
+    columns = np.ndarray((len(SHARED_COLUMNS), length), dtype=np.int64, buffer=block.buf)
+    columns[0] = bars.index.asi8
+    for row, name in enumerate(SHARED_COLUMNS[1:], start=1):
+        columns[row] = getattr(bars, name).view(np.int64)
+    tz = str(bars.index.tz) if bars.index.tz is not None else None
+    return block, {"name": block.name, "length": length, "tz": tz}
+
+
+def attach_price_bars(spec: Dict[str, Any]):
+    """PriceBars backed by a block created with share_price_bars, without copying it.
+
+    Returns (block, bars); keep the block referenced while the bars are in use.
+    """
+    # Spawned workers report to the parent's resource tracker, so the
+    # block stays registered once and is unlinked by the parent alone
+    block = shared_memory.SharedMemory(name=spec["name"])
+    columns = np.ndarray((len(SHARED_COLUMNS), spec["length"]), dtype=np.int64, buffer=block.buf)
+    index = pd.DatetimeIndex(columns[0].view("datetime64[ns]"))
+    if spec["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(spec["tz"])
+    bars = PriceBars(
+        index=index,
+        open=columns[1].view(np.float64),
+        close=columns[2].view(np.float64),
+        high=columns[3].view(np.float64),
+        low=columns[4].view(np.float64),
+        volume=columns[5],
+    )
+    return block, bars
+
+
+def load_fundamentals(ticker: str, days: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """The non-price part of the market data bundle for every backtest day.
+
+    Identical for every configuration, so it is fetched once by the parent
+    (through the response cache) instead of once per backtest.
+    """
+    line_items = search_line_items(ticker, MARKET_DATA_LINE_ITEMS, period='ttm', limit=2)
+    market_cap = get_market_cap(ticker)
+    return {
+        day: {
+            "financial_metrics": get_financial_metrics(ticker, day, period='ttm', limit=1),
+            "insider_trades": get_insider_trades(ticker, day, limit=5),
+            "market_cap": market_cap,
+            "financial_line_items": line_items,
+        }
+        for day in days
+    }
+
+
+# Per-worker state set up once by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(spec: Dict[str, Any], fundamentals: Dict[str, Dict[str, Any]]) -> None:
+    block, bars = attach_price_bars(spec)
+    _worker.update(block=block, bars=bars, fundamentals=fundamentals)
+
+
+def _run_configuration(parameters, ticker, start_date, end_date, initial_capital, rule_based):
+    bars = _worker["bars"]
+    fundamentals = _worker["fundamentals"]
+
+    def agent(ticker, start_date, end_date, portfolio, **kwargs):
+        market_data = {**fundamentals[end_date], "prices": bars.between(start_date, end_date)}
+        return run_hedge_fund(
+            ticker=ticker,
+            start_date=start_date,
+            end_date=end_date,
+            portfolio=portfolio,
+            market_data=market_data,
+            rule_based=rule_based,
+            parameters=parameters,
+            **kwargs
+        )
+
+    started_at = time.perf_counter()
+    backtester = Backtester(agent, ticker, start_date, end_date, initial_capital, prices=bars)
+    # The per-day trade log is not useful across hundreds of runs
+    with contextlib.redirect_stdout(io.StringIO()):
+        backtester.run_backtest()
+    metrics = performance_metrics(backtester.performance_df(), initial_capital)
+    return {**metrics, "seconds": time.perf_counter() - started_at}
+
+
+def run_sweep(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    grid: Dict[str, Iterable[Any]],
+    initial_capital: float = 100000,
+    max_workers: Optional[int] = None,
+    rule_based: bool = True,
+    output: Optional[str] = None,
+) -> pd.DataFrame:
+    """Backtest every configuration of a parameter grid on a pool of processes.
+
+    Prices are loaded once and placed in shared memory, which every worker
+    maps instead of receiving a pickled copy per task; the remaining market
+    data is fetched once per backtest day and sent to each worker once. Each
+    configuration is an independent backtest, so throughput scales with the
+    number of workers. Results are printed, and appended to ``output`` as
+    CSV, as each backtest finishes.
+
+    Args:
+        ticker: Ticker to backtest
+        start_date: First backtest day (YYYY-MM-DD)
+        end_date: Last backtest day (YYYY-MM-DD)
+        grid: Parameter grid, see expand_grid
+        initial_capital: Starting cash of every backtest
+        max_workers: Worker processes (default: one per CPU)
+        rule_based: Use the rule-based portfolio manager instead of the LLM
+        output: Optional CSV path for the streamed summary
+
+    Returns:
+        Summary DataFrame, one row per configuration, best Sharpe ratio first
+    """
+    configurations = expand_grid(grid)
+    history_start = (pd.Timestamp(start_date) - timedelta(days=30)).strftime("%Y-%m-%d")
+    bars = PriceBars.from_records(get_prices(ticker, history_start, end_date))
+    days = bars.between(start_date, end_date).index.strftime("%Y-%m-%d")
+    fundamentals = load_fundamentals(ticker, days)
+
+    columns = list(grid) + METRIC_COLUMNS
+    print(f"Running {len(configurations)} backtests of {ticker} on {max_workers or os.cpu_count()} workers...")
+    print("  ".join(columns))
+
+    rows = []
+    block, spec = share_price_bars(bars)
+    csv_file = open(output, "w", newline="") if output else None
+    try:
+        writer = csv.DictWriter(csv_file, fieldnames=columns) if csv_file else None
+        if writer:
+            writer.writeheader()
+        # Spawned workers start from fresh module state, so none of them
+        # inherits the parent's SQLite cache connections through a fork
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(spec, fundamentals),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _run_configuration, parameters, ticker, start_date, end_date, initial_capital, rule_based
+                ): parameters
+                for parameters in configurations
+            }
+            for future in as_completed(futures):
+                row = _flatten(futures[future])
+                try:
+                    row.update(future.result())
+                except Exception as e:
+                    row["error"] = str(e)
+                rows.append(row)
+                print("  ".join(str(row.get(column, "")) for column in columns))
+                if writer:
+                    writer.writerow(row)
+                    csv_file.flush()
+    finally:
+        if csv_file:
+            csv_file.close()
+        block.close()
+        block.unlink()
+
+    return pd.DataFrame(rows, columns=columns).sort_values("sharpe_ratio", ascending=False, na_position="last")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Backtest a grid of agent parameters in parallel')
+    parser.add_argument('--ticker', type=str, required=True, help='Stock ticker symbol (e.g., AAPL)')
+    parser.add_argument('--grid', type=str, required=True, help='JSON file mapping "agent.parameter" to a list of values')
+    parser.add_argument('--end_date', type=str, default=datetime.now().strftime('%Y-%m-%d'), help='End date in YYYY-MM-DD format')
+    parser.add_argument('--start_date', type=str, default=(datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d'), help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--initial_capital', type=float, default=100000, help='Initial capital amount (default: 100000)')
+    parser.add_argument('--workers', type=int, help='Number of worker processes (default: one per CPU)')
+    parser.add_argument('--output', type=str, help='CSV file the summary is streamed to')
+    parser.add_argument('--llm', action='store_true', help='Use the LLM portfolio manager instead of the rule-based one')
+    args = parser.parse_args()
+
+    with open(args.grid) as f:
+        grid = json.load(f)
+
+    summary = run_sweep(
+        args.ticker,
+        args.start_date,
+        args.end_date,
+        grid,
+        initial_capital=args.initial_capital,
+        max_workers=args.workers,
+        rule_based=not args.llm,
+        output=args.output,
+    )
+    print("\nBest configurations:")
+    print(summary.head(10).to_string(index=False))
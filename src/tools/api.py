@@ -1,7 +1,48 @@
-import os
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 import pandas as pd
-import requests
+
+from tools.cache import cached_call, get_response_cache
+from tools.http_client import get_financial_datasets_client
+from tools.price_bars import PriceBars
+from tools.price_store import get_price_store
+
+# Line items the market data agent requests for the valuation agent.
+MARKET_DATA_LINE_ITEMS = [
+    "free_cash_flow",
+    "net_income",
+    "depreciation_and_amortization",
+    "capital_expenditure",
+    "working_capital",
+]
+
+# Maximum number of tickers sent in one multi-ticker line item search.
+LINE_ITEMS_BATCH_SIZE = 25
+
+# How long (in seconds) a cached response stays fresh, per endpoint.
+# Price windows that end before today are immutable and never expire.
+CACHE_TTLS = {
+    "prices": 15 * 60,
+    "financial-metrics": 24 * 60 * 60,
+    "line-items": 24 * 60 * 60,
+    "insider-trades": 6 * 60 * 60,
+    "company-facts": 60 * 60,
+}
+
+def _request(
+    method: str,
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    body: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Send a request through the shared API client and return the decoded JSON body."""
+    response = get_financial_datasets_client().request(method, path, params=params, body=body)
+    if response.status_code != 200:
+        raise Exception(
+            f"Error fetching data: {response.status_code} - {response.text}"
+        )
+    return response.json()
 
 def get_financial_metrics(
     ticker: str,
@@ -10,25 +51,36 @@ def get_financial_metrics(
     limit: int = 1
 ) -> List[Dict[str, Any]]:
     """Fetch financial metrics from the API."""
-    headers = {"X-API-KEY": os.environ.get("FINANCIAL_DATASETS_API_KEY")}
-    url = (
-        f"https://api.financialdatasets.ai/financial-metrics/"
-        f"?ticker={ticker}"
-        f"&report_period_lte={report_period}"
-        f"&limit={limit}"
-        f"&period={period}"
+    params = {
+        "ticker": ticker.upper(),
+        "report_period_lte": report_period,
+        "limit": limit,
+        "period": period,
+    }
+    data = cached_call(
+        "financial-metrics",
+        params,
+        CACHE_TTLS["financial-metrics"],
+        lambda: _request("GET", "/financial-metrics/", params=params),
     )
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(
-            f"Error fetching data: {response.status_code} - {response.text}"
-        )
-    data = response.json()
     financial_metrics = data.get("financial_metrics")
     if not financial_metrics:
         raise ValueError("No financial metrics returned")
     return financial_metrics
 
+def _line_items_cache_params(
+    ticker: str,
+    line_items: List[str],
+    period: str,
+    limit: int
+) -> Dict[str, Any]:
+    return {
+        "tickers": [ticker.upper()],
+        "line_items": sorted(line_items),
+        "period": period,
+        "limit": limit
+    }
+
 def search_line_items(
     ticker: str,
     line_items: List[str],
@@ -36,26 +88,88 @@ def search_line_items(
     limit: int = 1
 ) -> List[Dict[str, Any]]:
     """Fetch cash flow statements from the API."""
-    headers = {"X-API-KEY": os.environ.get("FINANCIAL_DATASETS_API_KEY")}
-    url = "https://api.financialdatasets.ai/financials/search/line-items"
-
     body = {
-        "tickers": [ticker],
+        "tickers": [ticker.upper()],
         "line_items": line_items,
         "period": period,
         "limit": limit
     }
-    response = requests.post(url, headers=headers, json=body)
-    if response.status_code != 200:
-        raise Exception(
-            f"Error fetching data: {response.status_code} - {response.text}"
-        )
-    data = response.json()
+    data = cached_call(
+        "line-items",
+        _line_items_cache_params(ticker, line_items, period, limit),
+        CACHE_TTLS["line-items"],
+        lambda: _request("POST", "/financials/search/line-items", body=body),
+    )
     search_results = data.get("search_results")
     if not search_results:
         raise ValueError("No search results returned")
     return search_results
 
+def search_line_items_batch(
+    tickers: Iterable[str],
+    line_items: List[str],
+    period: str = 'ttm',
+    limit: int = 1
+) -> Dict[str, Union[List[Dict[str, Any]], Exception]]:
+    """Fetch line items for many tickers using the multi-ticker search endpoint.
+
+    Tickers are sent in chunks of ``LINE_ITEMS_BATCH_SIZE`` and the results are
+    grouped per ticker. Each ticker's results are also stored in the response
+    cache under its single-ticker key, so later ``search_line_items`` calls are
+    served locally. Tickers missing from a batch response fall back to a
+    single-ticker request.
+
+    Failures stay per ticker: every ticker maps to its results or to the
+    exception raised while fetching them, whether its chunk's request failed
+    or its single-ticker fallback did (e.g. an unknown ticker).
+    """
+    tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    cache = get_response_cache()
+    results: Dict[str, Union[List[Dict[str, Any]], Exception]] = {}
+    pending = []
+    for ticker in tickers:
+        cached = None
+        if cache is not None:
+            cached = cache.get("line-items", _line_items_cache_params(ticker, line_items, period, limit))
+        if cached and cached.get("search_results"):
+            results[ticker] = cached["search_results"]
+        else:
+            pending.append(ticker)
+
+    for i in range(0, len(pending), LINE_ITEMS_BATCH_SIZE):
+        chunk = pending[i:i + LINE_ITEMS_BATCH_SIZE]
+        body = {
+            "tickers": chunk,
+            "line_items": line_items,
+            "period": period,
+            "limit": limit
+        }
+        try:
+            data = _request("POST", "/financials/search/line-items", body=body)
+        except Exception as e:
+            for ticker in chunk:
+                results[ticker] = e
+            continue
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for item in data.get("search_results") or []:
+            grouped.setdefault(str(item.get("ticker", "")).upper(), []).append(item)
+        for ticker in chunk:
+            if ticker in grouped:
+                results[ticker] = grouped[ticker]
+                if cache is not None:
+                    cache.set(
+                        "line-items",
+                        _line_items_cache_params(ticker, line_items, period, limit),
+                        {"search_results": grouped[ticker]},
+                        CACHE_TTLS["line-items"],
+                    )
+                continue
+            try:
+                results[ticker] = search_line_items(ticker, line_items, period, limit)
+            except Exception as e:
+                results[ticker] = e
+    return results
+
 def get_insider_trades(
     ticker: str,
     end_date: str,
@@ -64,19 +178,17 @@ def get_insider_trades(
     """
     Fetch insider trades for a given ticker and date range.
     """
-    headers = {"X-API-KEY": os.environ.get("FINANCIAL_DATASETS_API_KEY")}
-    url = (
-        f"https://api.financialdatasets.ai/insider-trades/"
-        f"?ticker={ticker}"
-        f"&filing_date_lte={end_date}"
-        f"&limit={limit}"
+    params = {
+        "ticker": ticker.upper(),
+        "filing_date_lte": end_date,
+        "limit": limit,
+    }
+    data = cached_call(
+        "insider-trades",
+        params,
+        CACHE_TTLS["insider-trades"],
+        lambda: _request("GET", "/insider-trades/", params=params),
     )
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(
-            f"Error fetching data: {response.status_code} - {response.text}"
-        )
-    data = response.json()
     insider_trades = data.get("insider_trades")
     if not insider_trades:
         raise ValueError("No insider trades returned")
@@ -86,51 +198,161 @@ def get_market_cap(
     ticker: str,
 ) -> List[Dict[str, Any]]:
     """Fetch market cap from the API."""
-    headers = {"X-API-KEY": os.environ.get("FINANCIAL_DATASETS_API_KEY")}
-    url = (
-        f'https://api.financialdatasets.ai/company/facts'
-        f'?ticker={ticker}'
+    params = {"ticker": ticker.upper()}
+    data = cached_call(
+        "company-facts",
+        params,
+        CACHE_TTLS["company-facts"],
+        lambda: _request("GET", "/company/facts", params=params),
     )
-
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(
-            f"Error fetching data: {response.status_code} - {response.text}"
-        )
-    data = response.json()
     company_facts = data.get('company_facts')
     if not company_facts:
         raise ValueError("No company facts returned")
     return company_facts.get('market_cap')
 
-def get_prices(
+def _fetch_prices(
     ticker: str,
     start_date: str,
     end_date: str
 ) -> List[Dict[str, Any]]:
-    """Fetch price data from the API."""
-    headers = {"X-API-KEY": os.environ.get("FINANCIAL_DATASETS_API_KEY")}
-    url = (
-        f"https://api.financialdatasets.ai/prices/"
-        f"?ticker={ticker}"
-        f"&interval=day"
-        f"&interval_multiplier=1"
-        f"&start_date={start_date}"
-        f"&end_date={end_date}"
+    """Fetch price bars for a date range directly from the API (through the response cache)."""
+    params = {
+        "ticker": ticker.upper(),
+        "interval": "day",
+        "interval_multiplier": 1,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    # Bars for days that have closed never change; only windows reaching
+    # today need to be refetched once their TTL runs out. An empty reply may
+    # be a temporary upstream gap, so it is never cached as permanent.
+    today = datetime.now().strftime('%Y-%m-%d')
+    immutable = end_date < today
+
+    def ttl(data: Dict[str, Any]) -> Optional[float]:
+        return None if immutable and data.get("prices") else CACHE_TTLS["prices"]
+
+    data = cached_call(
+        "prices",
+        params,
+        ttl,
+        lambda: _request("GET", "/prices/", params=params),
     )
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(
-            f"Error fetching data: {response.status_code} - {response.text}"
-        )
-    data = response.json()
-    prices = data.get("prices")
+    return data.get("prices") or []
+
+def get_prices(
+    ticker: str,
+    start_date: str,
+    end_date: str
+) -> List[Dict[str, Any]]:
+    """Fetch price data, only requesting the dates missing from the local price store."""
+    store = get_price_store()
+    if store is None:
+        prices = _fetch_prices(ticker, start_date, end_date)
+    else:
+        prices = store.get(ticker, start_date, end_date, _fetch_prices)
     if not prices:
         raise ValueError("No price data returned")
     return prices
 
-def prices_to_df(prices: List[Dict[str, Any]]) -> pd.DataFrame:
-    """Convert prices to a DataFrame."""
+def prefetch_prices(
+    ticker: str,
+    start_date: str,
+    end_date: str
+) -> None:
+    """Load a whole date range into the price store ahead of many smaller reads."""
+    store = get_price_store()
+    if store is not None:
+        store.ensure(ticker, start_date, end_date, _fetch_prices)
+
+def resolve_date_range(
+    start_date: Optional[str],
+    end_date: Optional[str]
+) -> Tuple[str, str]:
+    """Fill in default dates: today as the end, 3 months before the end as the start."""
+    end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+    if not start_date:
+        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
+        start_date = end_date_obj.replace(month=end_date_obj.month - 3) if end_date_obj.month > 3 else \
+            end_date_obj.replace(year=end_date_obj.year - 1, month=end_date_obj.month + 9)
+        start_date = start_date.strftime('%Y-%m-%d')
+    return start_date, end_date
+
+def get_universe_market_data(
+    tickers: Iterable[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    max_workers: int = 8
+) -> Dict[str, Any]:
+    """Fetch the market data bundle for every ticker in the fund in one pass.
+
+    Line items go through the multi-ticker search endpoint; prices, metrics,
+    insider trades and market cap are single-ticker endpoints and are fanned
+    out over at most ``max_workers`` threads. Every response also lands in the
+    local caches, so agents that run afterwards are served locally.
+
+    Returns a mapping of ticker to either its bundle (the same keys the market
+    data agent puts into the state, with prices already parsed into
+    ``PriceBars``) or the exception raised while fetching it.
+    """
+    start_date, end_date = resolve_date_range(start_date, end_date)
+    tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    line_items = search_line_items_batch(tickers, MARKET_DATA_LINE_ITEMS, period='ttm', limit=2)
+
+    def fetch_bundle(ticker: str) -> Dict[str, Any]:
+        if isinstance(line_items[ticker], Exception):
+            raise line_items[ticker]
+        return {
+            "prices": PriceBars.from_records(get_prices(ticker, start_date, end_date)),
+            "financial_metrics": get_financial_metrics(ticker, end_date, period='ttm', limit=1),
+            "insider_trades": get_insider_trades(ticker, end_date, limit=5),
+            "market_cap": get_market_cap(ticker),
+            "financial_line_items": line_items[ticker],
+        }
+
+    def fetch_or_error(ticker: str) -> Any:
+        try:
+            return fetch_bundle(ticker)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(tickers, executor.map(fetch_or_error, tickers)))
+
+def get_price_matrix(
+    tickers: Iterable[str],
+    start_date: str,
+    end_date: str,
+    field: str = "close",
+    max_workers: int = 8
+) -> pd.DataFrame:
+    """Load one price field for many tickers into a single date x ticker matrix.
+
+    Tickers are loaded concurrently and land in the price store, so the
+    agents' later reads are served locally. Rows are the union of the
+    tickers' trading days, matched on the calendar day; a ticker without a
+    bar on a row is NaN there.
+    """
+    tickers = list(tickers)
+
+    def load(ticker: str) -> pd.Series:
+        bars = PriceBars.from_records(get_prices(ticker, start_date, end_date))
+        column = pd.Series(getattr(bars, field), index=bars.index.strftime('%Y-%m-%d'))
+        return column[~column.index.duplicated(keep='last')]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        columns = dict(zip(tickers, executor.map(load, tickers)))
+    matrix = pd.DataFrame(columns, columns=tickers).sort_index()
+    matrix.index = pd.DatetimeIndex(matrix.index, name="Date")
+    return matrix
+
+def prices_to_df(prices: Union[PriceBars, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """Convert prices to a DataFrame.
+
+    A ``PriceBars`` container is wrapped without copying or re-parsing.
+    """
+    if isinstance(prices, PriceBars):
+        return prices.to_df()
     df = pd.DataFrame(prices)
     df["Date"] = pd.to_datetime(df["time"])
     df.set_index("Date", inplace=True)
@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from tools import api
+
+
+class AsyncFinancialDatasetsClient:
+    """Asyncio front-end for the fetchers in ``tools.api``.
+
+    Each call runs the blocking fetcher on the client's own thread pool, so
+    concurrent requests still share the pooled HTTP session, rate limiter,
+    response cache and price store. Because the pool is not the event loop's
+    default executor, ``asyncio.run`` does not wait for fetches abandoned by
+    a timeout; call ``close`` once the client is no longer needed.
+    """
+
+    def __init__(self, max_workers: int = 5):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-data")
+
+    def close(self) -> None:
+        """Release the thread pool without waiting for fetches still in flight."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fetch: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fetch, *args))
+
+    async def get_prices(self, ticker: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        return await self._run(api.get_prices, ticker, start_date, end_date)
+
+    async def get_financial_metrics(
+        self,
+        ticker: str,
+        report_period: str,
+        period: str = 'ttm',
+        limit: int = 1,
+    ) -> List[Dict[str, Any]]:
+        return await self._run(api.get_financial_metrics, ticker, report_period, period, limit)
+
+    async def get_insider_trades(self, ticker: str, end_date: str, limit: int = 5) -> List[Dict[str, Any]]:
+        return await self._run(api.get_insider_trades, ticker, end_date, limit)
+
+    async def get_market_cap(self, ticker: str) -> Any:
+        return await self._run(api.get_market_cap, ticker)
+
+    async def search_line_items(
+        self,
+        ticker: str,
+        line_items: List[str],
+        period: str = 'ttm',
+        limit: int = 1,
+    ) -> List[Dict[str, Any]]:
+        return await self._run(api.search_line_items, ticker, line_items, period, limit)
+
+    async def get_market_data(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Fetch everything the analysts need for one ticker concurrently.
+
+        ``timeout`` is a budget shared by all five requests; ``asyncio.TimeoutError``
+        is raised if they have not all completed within it.
+        """
+        prices, financial_metrics, insider_trades, market_cap, financial_line_items = await asyncio.wait_for(
+            asyncio.gather(
+                self.get_prices(ticker, start_date, end_date),
+                self.get_financial_metrics(ticker, end_date, period='ttm', limit=1),
+                self.get_insider_trades(ticker, end_date, limit=5),
+                self.get_market_cap(ticker),
+                self.search_line_items(ticker, api.MARKET_DATA_LINE_ITEMS, period='ttm', limit=2),
+            ),
+            timeout,
+        )
+        return {
+            "prices": prices,
+            "financial_metrics": financial_metrics,
+            "insider_trades": insider_trades,
+            "market_cap": market_cap,
+            "financial_line_items": financial_line_items,
+        }
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Union
+
+DEFAULT_CACHE_DIR = ".cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def make_cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Build a content-addressed key from a namespace and its parameters.
+
+    Parameters are serialised with sorted keys so that the same request always
+    maps to the same key regardless of argument order.
+    """
+    canonical = json.dumps(
+        {"namespace": namespace, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with per-entry TTL and size-bounded LRU eviction.
+
+    Payloads are stored as zlib-compressed JSON. Entries whose ``expires_at`` is
+    NULL never expire, which is used for immutable data such as historical
+    price bars.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                payload BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, namespace: str, params: Dict[str, Any]) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired."""
+        key = make_cache_key(namespace, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, payload FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expires_at, payload = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+    def set(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        value: Any,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Store a JSON-serialisable value. A ``ttl`` of None never expires."""
+        key = make_cache_key(namespace, params)
+        payload = zlib.compress(json.dumps(value).encode("utf-8"))
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, namespace, expires_at, accessed_at, size, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, expires_at, now, len(payload), sqlite3.Binary(payload)),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """Remove every entry, or only the entries of one namespace."""
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM entries")
+            else:
+                self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under budget."""
+        self._conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall()
+        stale_keys = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale_keys)
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    """Whether local caching is enabled (``HEDGE_FUND_CACHE`` is not ``off``)."""
+    return os.environ.get("HEDGE_FUND_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+
+def get_cache_dir() -> str:
+    """Directory holding all local caches (``HEDGE_FUND_CACHE_DIR``)."""
+    return os.environ.get("HEDGE_FUND_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None if caching is disabled.
+
+    Configured through ``HEDGE_FUND_CACHE`` (set to ``off`` to disable),
+    ``HEDGE_FUND_CACHE_DIR`` and ``HEDGE_FUND_CACHE_MAX_MB``.
+    """
+    global _response_cache
+    if not cache_enabled():
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            cache_dir = get_cache_dir()
+            max_mb = float(os.environ.get("HEDGE_FUND_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+            _response_cache = ResponseCache(
+                os.path.join(cache_dir, "responses.sqlite3"),
+                max_bytes=int(max_mb * 1024 * 1024),
+            )
+    return _response_cache
+
+
+def cached_call(
+    namespace: str,
+    params: Dict[str, Any],
+    ttl: Union[Optional[float], Callable[[Any], Optional[float]]],
+    fetch: Callable[[], Any],
+) -> Any:
+    """Return the cached response for ``params``, calling ``fetch`` on a miss.
+
+    ``ttl`` may be a function of the fetched value, for responses whose
+    lifetime depends on their content.
+    """
+    cache = get_response_cache()
+    if cache is not None:
+        cached = cache.get(namespace, params)
+        if cached is not None:
+            return cached
+    value = fetch()
+    if cache is not None:
+        cache.set(namespace, params, value, ttl(value) if callable(ttl) else ttl)
+    return value
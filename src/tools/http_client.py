@@ -0,0 +1,146 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace requests on the client side."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        # A bucket that cannot hold one whole token would never grant one
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class APIClient:
+    """Keep-alive HTTP client with a bounded connection pool, retries and rate limiting.
+
+    Transient failures (connection errors, timeouts, 429 and 5xx responses) are
+    retried with jittered exponential backoff. A ``Retry-After`` header from the
+    server takes precedence over the computed delay, capped at ``backoff_max``.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        pool_size: int = 10,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 30.0,
+    ):
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+    ) -> requests.Response:
+        """Send a request, retrying transient failures. Returns the final response."""
+        url = f"{self.base_url}{path}"
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.request(
+                    method, url, params=params, json=body, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            delay = _retry_after_seconds(response)
+            time.sleep(min(delay, self.backoff_max) if delay is not None else self._backoff(attempt))
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+_clients: Dict[Any, APIClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_financial_datasets_client() -> APIClient:
+    """Return the shared client for the financial datasets API.
+
+    One client (and rate limiter) is kept per API key. The request rate is
+    configured with ``FINANCIAL_DATASETS_RATE_LIMIT`` (requests per second) and
+    ``FINANCIAL_DATASETS_RATE_BURST``; the pool size with
+    ``FINANCIAL_DATASETS_POOL_SIZE``.
+    """
+    api_key = os.environ.get("FINANCIAL_DATASETS_API_KEY")
+    key = ("financialdatasets", api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            rate = float(os.environ.get("FINANCIAL_DATASETS_RATE_LIMIT", 10))
+            burst = float(os.environ.get("FINANCIAL_DATASETS_RATE_BURST", rate))
+            client = APIClient(
+                "https://api.financialdatasets.ai",
+                headers={"X-API-KEY": api_key} if api_key else {},
+                rate_limiter=TokenBucket(rate, burst) if rate > 0 else None,
+                pool_size=int(os.environ.get("FINANCIAL_DATASETS_POOL_SIZE", 10)),
+            )
+            _clients[key] = client
+    return client
@@ -0,0 +1,39 @@
+import threading
+from typing import Any, Dict
+
+from langchain_core.runnables import Runnable
+from langchain_openai.chat_models import ChatOpenAI
+
+_llms: Dict[Any, Any] = {}
+_llms_lock = threading.Lock()
+
+
+def get_llm(model: str) -> ChatOpenAI:
+    """Return the shared chat model client for ``model``.
+
+    The client is created on first use rather than at import, and reused
+    afterwards so its HTTP connection pool is shared by every call.
+    """
+    key = ("chat", model)
+    with _llms_lock:
+        llm = _llms.get(key)
+        if llm is None:
+            llm = ChatOpenAI(model=model)
+            _llms[key] = llm
+    return llm
+
+
+def get_structured_llm(model: str, schema: type) -> Runnable:
+    """Return the shared client for ``model`` bound to a pydantic output schema.
+
+    Uses OpenAI structured outputs, so replies are constrained to the schema
+    and come back as ``schema`` instances instead of free text.
+    """
+    key = ("structured", model, schema)
+    with _llms_lock:
+        llm = _llms.get(key)
+    if llm is None:
+        llm = get_llm(model).with_structured_output(schema, method="json_schema")
+        with _llms_lock:
+            llm = _llms.setdefault(key, llm)
+    return llm
@@ -1,10 +1,39 @@
 import os
 import json
+import threading
+import time
 from openai import OpenAI
-from typing import Dict, List, Any
+from typing import Dict, Any
 
-def get_reindustrialization_trends() -> Dict[str, Any]:
-    """Get latest trends and news about American reindustrialization using Perplexity API."""
+from .cache import get_response_cache
+
+# Seconds a fetched trends report is served without refreshing it
+TRENDS_CACHE_TTL = float(os.getenv('TRENDS_CACHE_TTL', 6 * 60 * 60))
+# Seconds past TRENDS_CACHE_TTL a stale report is still served while it is
+# refreshed in the background; older reports are fetched synchronously
+TRENDS_MAX_STALE = float(os.getenv('TRENDS_MAX_STALE', 7 * 24 * 60 * 60))
+
+TRENDS_CACHE_PARAMS = {"model": "sonar-pro", "report": "reindustrialization"}
+
+FALLBACK_TRENDS = {
+    "summary": "American manufacturing continues to show resilience despite global economic headwinds. Recent data indicates steady investment in domestic production capacity, particularly in semiconductor manufacturing, clean energy, and defense sectors. The CHIPS Act and Inflation Reduction Act continue to drive capital allocation toward strategic industries.",
+    "highlights": [
+        "Intel's $20B expansion of its Ohio semiconductor facilities marks a significant milestone in domestic chip production",
+        "The Department of Energy approved $7B in grants for clean energy manufacturing projects across multiple states",
+        "Reshoring Initiative data shows 2024 Q1 manufacturing job announcements exceeded 2023 levels by 18%",
+        "Electric vehicle and battery production investments accelerated with new facilities announced in Georgia, Michigan, and Tennessee",
+        "Bipartisan legislative efforts to strengthen critical supply chains for defense and healthcare sectors gained momentum"
+    ]
+}
+
+_refresh_lock = threading.Lock()
+_refresh_thread = None
+
+def fetch_reindustrialization_trends() -> Dict[str, Any]:
+    """Get latest trends and news about American reindustrialization using Perplexity API.
+
+    Raises on failure; get_reindustrialization_trends adds caching and a fallback.
+    """
     api_key = os.getenv('PERPLEXITY_API_KEY')
     if not api_key:
         raise ValueError("Missing PERPLEXITY_API_KEY in environment variables")
@@ -126,13 +155,53 @@ The 'highlights' must be an array of 5 specific, concrete data points or develop
             
     except Exception as e:
         print(f"Error fetching reindustrialization trends: {e}")
-        return {
-            "summary": "American manufacturing continues to show resilience despite global economic headwinds. Recent data indicates steady investment in domestic production capacity, particularly in semiconductor manufacturing, clean energy, and defense sectors. The CHIPS Act and Inflation Reduction Act continue to drive capital allocation toward strategic industries.",
-            "highlights": [
-                "Intel's $20B expansion of its Ohio semiconductor facilities marks a significant milestone in domestic chip production",
-                "The Department of Energy approved $7B in grants for clean energy manufacturing projects across multiple states",
-                "Reshoring Initiative data shows 2024 Q1 manufacturing job announcements exceeded 2023 levels by 18%",
-                "Electric vehicle and battery production investments accelerated with new facilities announced in Georgia, Michigan, and Tennessee",
-                "Bipartisan legislative efforts to strengthen critical supply chains for defense and healthcare sectors gained momentum"
-            ]
-        }
+        raise
+
+
+def _fetch_and_store() -> Dict[str, Any]:
+    trends = fetch_reindustrialization_trends()
+    cache = get_response_cache()
+    if cache is not None:
+        cache.set(
+            "perplexity-trends",
+            TRENDS_CACHE_PARAMS,
+            {"fetched_at": time.time(), "trends": trends},
+            ttl=TRENDS_CACHE_TTL + TRENDS_MAX_STALE,
+        )
+    return trends
+
+def _refresh_in_background() -> None:
+    def refresh():
+        try:
+            _fetch_and_store()
+        except Exception:
+            pass  # Already reported; the stale copy stays in place
+
+    global _refresh_thread
+    with _refresh_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return
+        # Not a daemon, so a short-lived process finishes the refresh before exiting
+        _refresh_thread = threading.Thread(target=refresh, name="trends-refresh")
+        _refresh_thread.start()
+
+def get_reindustrialization_trends() -> Dict[str, Any]:
+    """Latest reindustrialization trends, served from the response cache when possible.
+
+    A report younger than TRENDS_CACHE_TTL is returned as is. An older one is
+    returned immediately while a background thread fetches a replacement
+    (stale-while-revalidate). Only when there is no usable copy is the
+    Perplexity API called synchronously, falling back to FALLBACK_TRENDS if
+    that fails; fallbacks are never cached.
+    """
+    cache = get_response_cache()
+    cached = cache.get("perplexity-trends", TRENDS_CACHE_PARAMS) if cache is not None else None
+    if cached is not None:
+        if time.time() - cached["fetched_at"] >= TRENDS_CACHE_TTL:
+            _refresh_in_background()
+        return cached["trends"]
+
+    try:
+        return _fetch_and_store()
+    except Exception:
+        return dict(FALLBACK_TRENDS)
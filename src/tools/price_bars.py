@@ -0,0 +1,97 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ["open", "close", "high", "low"]
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    values.flags.writeable = False
+    return values
+
+
+class PriceBars:
+    """Immutable columnar daily bars: one typed array per field plus a datetime64 index.
+
+    Built once by the market data agent from the API's list of price dicts.
+    Prices are float64, volume is int64 and every array is read-only, so all
+    agents can share one instance; ``to_df`` wraps the arrays in a DataFrame
+    without copying or re-parsing them.
+    """
+
+    __slots__ = ("index", "open", "close", "high", "low", "volume")
+
+    def __init__(
+        self,
+        index: pd.DatetimeIndex,
+        open: np.ndarray,
+        close: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        volume: np.ndarray,
+    ):
+        columns = {"open": open, "close": close, "high": high, "low": low}
+        for name, values in columns.items():
+            object.__setattr__(self, name, _read_only(np.asarray(values, dtype=np.float64)))
+        object.__setattr__(self, "volume", _read_only(np.asarray(volume, dtype=np.int64)))
+        object.__setattr__(self, "index", pd.DatetimeIndex(index, name="Date"))
+        if any(len(getattr(self, name)) != len(self.index) for name in PRICE_FIELDS + ["volume"]):
+            raise ValueError("All price columns must have the same length as the index")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("PriceBars is immutable")
+
+    @classmethod
+    def from_records(cls, prices: List[Dict[str, Any]]) -> "PriceBars":
+        """Parse the API's list of price dicts once, sorted by time."""
+        index = pd.to_datetime([row["time"] for row in prices])
+        order = np.argsort(index.asi8, kind="stable")
+
+        def column(field: str) -> np.ndarray:
+            return np.array([np.nan if row.get(field) is None else row[field] for row in prices], dtype=np.float64)[order]
+
+        return cls(
+            index=index[order],
+            open=column("open"),
+            close=column("close"),
+            high=column("high"),
+            low=column("low"),
+            volume=np.array([row.get("volume") or 0 for row in prices], dtype=np.int64)[order],
+        )
+
+    def between(self, start_date: str, end_date: str) -> "PriceBars":
+        """Bars dated from start_date through end_date, as views over these arrays."""
+        # Compare calendar days in the index's own time zone
+        days = self.index.normalize()
+        lo = days.searchsorted(pd.Timestamp(start_date).tz_localize(self.index.tz), side="left")
+        hi = days.searchsorted(pd.Timestamp(end_date).tz_localize(self.index.tz), side="right")
+        return PriceBars(
+            index=self.index[lo:hi],
+            open=self.open[lo:hi],
+            close=self.close[lo:hi],
+            high=self.high[lo:hi],
+            low=self.low[lo:hi],
+            volume=self.volume[lo:hi],
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in PRICE_FIELDS + ["volume"]) + self.index.nbytes
+
+    def to_df(self) -> pd.DataFrame:
+        """DataFrame view over the bars; the columns share memory with this container."""
+        return pd.DataFrame(
+            {
+                "open": self.open,
+                "close": self.close,
+                "high": self.high,
+                "low": self.low,
+                "volume": self.volume,
+            },
+            index=self.index,
+            copy=False,
+        )
@@ -0,0 +1,215 @@
+import os
+import threading
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tools.cache import cache_enabled, get_cache_dir
+
+PRICE_COLUMNS = ["open", "close", "high", "low", "volume"]
+
+# fetch(ticker, start_date, end_date) -> list of price dicts as returned by the API
+PriceFetcher = Callable[[str, str, str], List[Dict[str, Any]]]
+
+
+def _to_day(value: str) -> np.datetime64:
+    return np.datetime64(value[:10], "D")
+
+
+def _day_str(value: np.datetime64) -> str:
+    return str(value.astype("datetime64[D]"))
+
+
+class PriceStore:
+    """Per-ticker columnar store of daily bars that only fetches missing date ranges.
+
+    Each ticker is persisted as an ``.npz`` file holding one array per column
+    plus the list of date intervals that have already been fetched. A request
+    for a range computes the gaps against those intervals, fetches only the
+    gaps, merges them in and serves the whole range locally.
+
+    Intervals are only recorded up to yesterday, so bars for the current
+    (still open) session are always refetched. A gap containing a weekday
+    that came back empty is not recorded either, so a temporary upstream
+    outage is retried instead of being stored as a range without bars.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def get(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        fetch: PriceFetcher,
+    ) -> List[Dict[str, Any]]:
+        """Return the bars between ``start_date`` and ``end_date`` (inclusive)."""
+        columns = self.ensure(ticker, start_date, end_date, fetch)
+        return self._rows(columns, _to_day(start_date), _to_day(end_date))
+
+    def ensure(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        fetch: PriceFetcher,
+    ) -> Dict[str, np.ndarray]:
+        """Fetch whatever part of the range is missing and return all stored columns."""
+        ticker = ticker.upper()
+        start, end = _to_day(start_date), _to_day(end_date)
+        with self._lock_for(ticker):
+            columns, intervals = self._load(ticker)
+            gaps = self.missing_intervals(intervals, start, end)
+            if not gaps:
+                return columns
+
+            last_closed_day = np.datetime64(date.today() - timedelta(days=1), "D")
+            for gap_start, gap_end in gaps:
+                rows = fetch(ticker, _day_str(gap_start), _day_str(gap_end))
+                columns = self._merge(columns, self._columns_from_rows(rows))
+                covered_end = min(gap_end, last_closed_day)
+                if not rows and np.busday_count(gap_start, covered_end + np.timedelta64(1, "D")) > 0:
+                    continue
+                if covered_end >= gap_start:
+                    intervals = self._add_interval(intervals, gap_start, covered_end)
+            self._save(ticker, columns, intervals)
+            return columns
+
+    @staticmethod
+    def missing_intervals(
+        intervals: List[Tuple[np.datetime64, np.datetime64]],
+        start: np.datetime64,
+        end: np.datetime64,
+    ) -> List[Tuple[np.datetime64, np.datetime64]]:
+        """Return the sub-ranges of ``[start, end]`` not covered by ``intervals``."""
+        one_day = np.timedelta64(1, "D")
+        gaps = []
+        cursor = start
+        for interval_start, interval_end in intervals:
+            if interval_end < cursor:
+                continue
+            if interval_start > end:
+                break
+            if interval_start > cursor:
+                gaps.append((cursor, interval_start - one_day))
+            cursor = max(cursor, interval_end + one_day)
+            if cursor > end:
+                return gaps
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    @staticmethod
+    def _add_interval(
+        intervals: List[Tuple[np.datetime64, np.datetime64]],
+        start: np.datetime64,
+        end: np.datetime64,
+    ) -> List[Tuple[np.datetime64, np.datetime64]]:
+        """Insert ``[start, end]`` and coalesce overlapping or adjacent intervals."""
+        one_day = np.timedelta64(1, "D")
+        merged: List[Tuple[np.datetime64, np.datetime64]] = []
+        for interval_start, interval_end in sorted(intervals + [(start, end)]):
+            if merged and interval_start <= merged[-1][1] + one_day:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], interval_end))
+            else:
+                merged.append((interval_start, interval_end))
+        return merged
+
+    @staticmethod
+    def _columns_from_rows(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        times = [row["time"] for row in rows]
+        columns = {
+            "time": np.array(times, dtype="U32"),
+            "date": np.array([_to_day(t) for t in times], dtype="datetime64[D]"),
+        }
+        for col in ["open", "close", "high", "low"]:
+            columns[col] = np.array(
+                [np.nan if row.get(col) is None else row[col] for row in rows], dtype=np.float64
+            )
+        columns["volume"] = np.array([row.get("volume") or 0 for row in rows], dtype=np.int64)
+        return columns
+
+    @staticmethod
+    def _merge(
+        existing: Optional[Dict[str, np.ndarray]],
+        new: Dict[str, np.ndarray],
+    ) -> Dict[str, np.ndarray]:
+        """Merge two column sets by date; bars in ``new`` win on duplicate dates."""
+        if existing is None or len(existing["date"]) == 0:
+            return new
+        if len(new["date"]) == 0:
+            return existing
+        combined = {key: np.concatenate([existing[key], new[key]]) for key in existing}
+        order = np.argsort(combined["date"], kind="stable")
+        dates = combined["date"][order]
+        keep_last = np.append(dates[1:] != dates[:-1], True)
+        index = order[keep_last]
+        return {key: values[index] for key, values in combined.items()}
+
+    @staticmethod
+    def _rows(
+        columns: Optional[Dict[str, np.ndarray]],
+        start: np.datetime64,
+        end: np.datetime64,
+    ) -> List[Dict[str, Any]]:
+        if columns is None:
+            return []
+        lo = np.searchsorted(columns["date"], start, side="left")
+        hi = np.searchsorted(columns["date"], end, side="right")
+        return [
+            {
+                "time": str(columns["time"][i]),
+                "open": float(columns["open"][i]),
+                "close": float(columns["close"][i]),
+                "high": float(columns["high"][i]),
+                "low": float(columns["low"][i]),
+                "volume": int(columns["volume"][i]),
+            }
+            for i in range(lo, hi)
+        ]
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.directory, f"{ticker}.npz")
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _load(self, ticker: str):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None, []
+        with np.load(path) as stored:
+            columns = {key: stored[key] for key in ["time", "date"] + PRICE_COLUMNS}
+            intervals = [(row[0], row[1]) for row in stored["intervals"]]
+        return columns, intervals
+
+    def _save(self, ticker: str, columns: Dict[str, np.ndarray], intervals) -> None:
+        path = self._path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            intervals=np.array(intervals, dtype="datetime64[D]").reshape(-1, 2),
+            **columns,
+        )
+        os.replace(tmp_path, path)
+
+
+_price_store: Optional[PriceStore] = None
+_price_store_lock = threading.Lock()
+
+
+def get_price_store() -> Optional[PriceStore]:
+    """Return the process-wide price store, or None if caching is disabled."""
+    global _price_store
+    if not cache_enabled():
+        return None
+    with _price_store_lock:
+        if _price_store is None:
+            _price_store = PriceStore(os.path.join(get_cache_dir(), "prices"))
+    return _price_store
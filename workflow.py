@@ -6,10 +6,17 @@ from datetime import datetime
 import pytz
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
-from src.tools.db import get_subscriber_emails
-from src.tools.report import send_email_report
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from tools.api import get_universe_market_data
+from main import DEFAULT_PORTFOLIO, analyze_ticker, collect_signals
+from agents.portfolio_manager import batch_portfolio_decisions
+from tools.db import get_subscriber_emails
+from tools.perplexity_client import get_reindustrialization_trends
+from tools.report import send_email_report
+import tempfile
 import time
 import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # Configure logging
 logging.basicConfig(
@@ -35,74 +42,50 @@ def check_environment():
     if missing_vars:
         raise EnvironmentError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
-def process_ticker(ticker):
-    """Process a single ticker and return its analysis result."""
+def process_ticker(ticker, market_data=None, deadline=None):
+    """Process a single ticker in-process and return its analysis result.
+    
+    Args:
+        ticker: Ticker symbol to analyze
+        market_data: Optional prefetched market data bundle for the ticker
+        deadline: Optional time.monotonic() value bounding the API and LLM calls
+    """
     try:
-        import subprocess
-        result = subprocess.run(
-            ['python', 'src/main.py', '--ticker', ticker, '--show-reasoning'],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
-            logger.error(f"Error analyzing {ticker}: {result.stderr}")
-            return None
-            
-        # Extract the final result JSON block
-        output_lines = result.stdout.split('\n')
-        json_lines = []
-        found_final = False
-        for line in output_lines:
-            if 'Final Result:' in line:
-                found_final = True
-                continue
-            if found_final:
-                json_lines.append(line)
-        
-        if not json_lines:
-            logger.error(f"Error parsing JSON result for {ticker}")
-            return None
-            
-        json_str = '\n'.join(json_lines)
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            logger.error(f"Error parsing JSON result for {ticker}")
-            return None
-            
+        return analyze_ticker(ticker, market_data=market_data, deadline=deadline)
     except Exception as e:
         logger.error(f"Error processing {ticker}: {str(e)}")
         return None
 
-def distribute_reports(test_email=None):
+def process_ticker_signals(ticker, market_data=None, deadline=None):
+    """Run every agent except the portfolio manager for one ticker.
+    
+    Returns:
+        (signals, portfolio) for batch_portfolio_decisions, or None on failure
+    """
+    try:
+        portfolio = dict(DEFAULT_PORTFOLIO)
+        return collect_signals(ticker, portfolio=portfolio, market_data=market_data, deadline=deadline), portfolio
+    except Exception as e:
+        logger.error(f"Error processing {ticker}: {str(e)}")
+        return None
+
+def distribute_reports(test_email=None, trends=None):
     """Send reports to all subscribers.
     
     Args:
         test_email: If provided, sends only to this email address (test mode)
+        trends: Reindustrialization trends fetched beforehand; fetched here if None
     """
     try:
-        # Fetch reindustrialization trends once for all emails
-        try:
-            from src.tools.perplexity_client import get_reindustrialization_trends
+        # Fetch reindustrialization trends once for all emails; this falls
+        # back to a generic report itself if Perplexity is unavailable
+        if trends is None:
             logger.info("Fetching reindustrialization trends...")
             trends = get_reindustrialization_trends()
-            logger.info("Successfully fetched reindustrialization trends")
-        except Exception as e:
-            logger.error(f"Error fetching reindustrialization trends: {e}")
-            # Fallback trends data
-            trends = {
-                'summary': 'American manufacturing continues to show resilience despite global economic headwinds.',
-                'highlights': [
-                    "Recent data indicates steady investment in domestic production capacity.",
-                    "CHIPS Act and Inflation Reduction Act continue to drive capital allocation toward strategic industries."
-                ]
-            }
             
         if test_email:
             # Test mode - send only to specified email
             logger.info(f'TEST MODE: Sending report only to {test_email}')
-            from src.tools.report import send_email_report
             send_email_report([test_email], trends)
             logger.info(f'TEST MODE: Sent report to {test_email}')
             return
@@ -112,7 +95,6 @@ def distribute_reports(test_email=None):
         total = len(emails)
         logger.info(f'Starting distribution to {total} subscribers...')
         
-        from src.tools.report import send_email_report
         for i, email in enumerate(emails, 1):
             try:
                 send_email_report([email], trends)
@@ -125,12 +107,90 @@ def distribute_reports(test_email=None):
     except Exception as e:
         logger.error(f'Distribution error: {e}')
 
-def run_analysis(test_email=None):
+def analyze_tickers_concurrently(tickers, universe_data, max_workers, ticker_timeout, worker=process_ticker):
+    """Analyze tickers on a bounded thread pool.
+    
+    Each ticker gets a deadline ticker_timeout seconds after its analysis
+    starts, which caps its market data requests and LLM call so a slow API
+    releases the worker slot. Threads cannot be interrupted, so a ticker
+    past its deadline is reported as timed out immediately, but its slot is
+    only freed once the in-flight call returns (within that call's timeout);
+    tickers queued behind it start, and start their clocks, after that.
+    
+    Args:
+        tickers: Tickers to analyze
+        universe_data: Prefetched market data bundles keyed by ticker
+        max_workers: Maximum number of tickers analyzed at the same time
+        ticker_timeout: Seconds a single ticker may run before it is abandoned
+        worker: Called as worker(ticker, market_data, deadline); process_ticker by default
+    
+    Returns:
+        Dictionary of ticker to result (None on failure or timeout), in input order
+    """
+    started_at = {}
+    
+    def run(ticker):
+        started_at[ticker] = time.monotonic()
+        bundle = universe_data.get(ticker.upper())
+        deadline = started_at[ticker] + ticker_timeout
+        return worker(ticker, None if isinstance(bundle, Exception) else bundle, deadline)
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {executor.submit(run, ticker): ticker for ticker in tickers}
+    results = {}
+    total = len(tickers)
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker = pending.pop(future)
+                results[ticker] = future.result()
+                status = "ok" if results[ticker] else "failed"
+                logger.info(f"Processed {ticker} ({status}) [{len(results)}/{total}]")
+            
+            # Threads cannot be interrupted, so a ticker that overruns its
+            # budget is abandoned and its eventual result ignored
+            now = time.monotonic()
+            for future, ticker in list(pending.items()):
+                start = started_at.get(ticker)
+                if start is not None and now - start > ticker_timeout:
+                    pending.pop(future)
+                    results[ticker] = None
+                    logger.error(f"Timed out analyzing {ticker} after {ticker_timeout}s [{len(results)}/{total}]")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return {ticker: results.get(ticker) for ticker in tickers}
+
+def write_fund_state(results, path='fund_state.json'):
+    """Atomically replace the fund state file with the given holdings."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.fund_state.', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"holdings": results}, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def run_analysis(test_email=None, max_workers=None, ticker_timeout=None, batch_size=None):
     """Main function to run the weekly analysis and distribution.
     
     Args:
         test_email: If provided, runs in test mode sending only to this email
+        max_workers: Number of tickers analyzed in parallel (default: ANALYSIS_WORKERS or 4)
+        ticker_timeout: Seconds allowed per ticker (default: TICKER_TIMEOUT or 300)
+        batch_size: Tickers per portfolio-level LLM decision; 0 makes one
+            decision per ticker (default: DECISION_BATCH_SIZE or 0)
     """
+    if max_workers is None:
+        max_workers = int(os.getenv('ANALYSIS_WORKERS', 4))
+    if ticker_timeout is None:
+        ticker_timeout = float(os.getenv('TICKER_TIMEOUT', 300))
+    if batch_size is None:
+        batch_size = int(os.getenv('DECISION_BATCH_SIZE', 0))
+
     logger.info("Starting weekly reindustrialization report distribution...")
     
     try:
@@ -145,31 +205,52 @@ def run_analysis(test_email=None):
             for category in fund_data['holdings'].values():
                 tickers.extend(category['holdings'])
         
-        # Process tickers and collect results
-        results = {}
-        successful = 0
-        failed = 0
+        # Fetch the trends report on its own thread while the tickers are
+        # analyzed, so its latency is off the critical path
+        trends_executor = ThreadPoolExecutor(max_workers=1)
+        trends_future = trends_executor.submit(get_reindustrialization_trends)
+        trends_executor.shutdown(wait=False)
         
-        for ticker in tickers:
-            logger.info(f"Processing {ticker}...")
-            result = process_ticker(ticker)
-            
-            if result:
-                results[ticker] = result
-                successful += 1
-            else:
-                failed += 1
+        # Prefetch market data for the whole universe in one pass so every
+        # per-ticker analysis below starts from data already in memory. A
+        # ticker without a bundle fetches its own data, and fails on its own
+        logger.info(f"Prefetching market data for {len(tickers)} tickers...")
+        try:
+            universe_data = get_universe_market_data(tickers)
+        except Exception as e:
+            logger.error(f"Error prefetching market data, fetching per ticker: {e}")
+            universe_data = {}
+        for ticker, bundle in universe_data.items():
+            if isinstance(bundle, Exception):
+                logger.warning(f"Could not prefetch data for {ticker}: {bundle}")
+        
+        # Process tickers in parallel and collect results
+        logger.info(f"Analyzing {len(tickers)} tickers with {max_workers} workers...")
+        if batch_size > 0:
+            # Collect every ticker's signals, then decide them together in
+            # chunks that share one system prompt per LLM call
+            collected = analyze_tickers_concurrently(
+                tickers, universe_data, max_workers, ticker_timeout, worker=process_ticker_signals
+            )
+            entries = {ticker: entry for ticker, entry in collected.items() if entry}
+            logger.info(f"Deciding {len(entries)} tickers in batches of {batch_size}...")
+            decisions = batch_portfolio_decisions(entries, chunk_size=batch_size)
+            analyzed = {ticker: decisions[ticker].model_dump() if decisions.get(ticker) else None for ticker in tickers}
+        else:
+            analyzed = analyze_tickers_concurrently(tickers, universe_data, max_workers, ticker_timeout)
+        results = {ticker: result for ticker, result in analyzed.items() if result}
+        successful = len(results)
+        failed = len(tickers) - successful
         
         # Write results to fund_state.json
-        with open('fund_state.json', 'w') as f:
-            json.dump({"holdings": results}, f, indent=2)
+        write_fund_state(results)
         
-        logger.info(f"Analysis complete. Results written to fund_state.json")
+        logger.info("Analysis complete. Results written to fund_state.json")
         logger.info(f"Successfully analyzed: {successful} tickers")
         logger.info(f"Failed analyses: {failed} tickers")
         
         # Distribute reports
-        distribute_reports(test_email)
+        distribute_reports(test_email, trends_future.result())
         
         logger.info("Weekly report distribution completed!")
         
@@ -183,6 +264,9 @@ def main():
     parser = argparse.ArgumentParser(description='Run reindustrialization newsletter workflow')
     parser.add_argument('--email', type=str, help='Email address for test mode (sends only to this address)')
     parser.add_argument('--test', action='store_true', help='Run in test mode (alternative to --email)')
+    parser.add_argument('--workers', type=int, help='Number of tickers to analyze in parallel (default: ANALYSIS_WORKERS or 4)')
+    parser.add_argument('--ticker-timeout', type=float, help='Seconds allowed per ticker analysis (default: TICKER_TIMEOUT or 300)')
+    parser.add_argument('--batch-size', type=int, help='Tickers per portfolio-level LLM decision, 0 for one call per ticker (default: DECISION_BATCH_SIZE or 0)')
     args = parser.parse_args()
     
     # Determine test email (if any)
@@ -195,18 +279,19 @@ def main():
     if test_email:
         # Run once in test mode
         logger.info(f"Running in TEST MODE for {test_email}")
-        run_analysis(test_email)
+        run_analysis(test_email, max_workers=args.workers, ticker_timeout=args.ticker_timeout, batch_size=args.batch_size)
     else:
         # Run normally with scheduler
         # Run analysis immediately at startup
         logger.info("Running initial analysis at startup...")
-        run_analysis()
+        run_analysis(max_workers=args.workers, ticker_timeout=args.ticker_timeout, batch_size=args.batch_size)
         
         scheduler = BlockingScheduler()
         
         # Schedule the job to run every Monday at 6 AM CST
         scheduler.add_job(
             run_analysis,
+            kwargs={'max_workers': args.workers, 'ticker_timeout': args.ticker_timeout, 'batch_size': args.batch_size},
             trigger=CronTrigger(
                 day_of_week='mon',
                 hour=6,